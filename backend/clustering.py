@@ -0,0 +1,238 @@
+"""
+Cluster hierarchy over course embeddings for level-of-detail graph views.
+
+Level 0 is seeded by department: each department's mean embedding is an
+initial centroid and a few rounds of spherical k-means let courses move to
+the cluster they are semantically closest to. Every cluster larger than
+leaf_size is then split with k-means into up to `branching` children, level
+by level, until clusters are small enough to show their member courses.
+"""
+import numpy as np
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def spherical_kmeans(embeddings, centroids, iterations=10):
+    """
+    Cluster normalized embeddings by cosine similarity from initial centroids.
+
+    Returns:
+        (labels, centroids): cluster index per row and normalized centroids.
+        Clusters that end up empty are dropped and labels renumbered.
+    """
+    centroids = _normalize(np.asarray(centroids, dtype=np.float32))
+    labels = np.zeros(len(embeddings), dtype=np.int32)
+    for _ in range(iterations):
+        new_labels = np.argmax(embeddings @ centroids.T, axis=1).astype(np.int32)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, new_labels, embeddings)
+        counts = np.bincount(new_labels, minlength=len(centroids))
+        # Keep the previous centroid for clusters that lost all members
+        sums[counts == 0] = centroids[counts == 0]
+        centroids = _normalize(sums)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    used = np.flatnonzero(np.bincount(labels, minlength=len(centroids)))
+    remap = np.full(len(centroids), -1, dtype=np.int32)
+    remap[used] = np.arange(len(used), dtype=np.int32)
+    return remap[labels], centroids[used]
+
+
+def farthest_point_seeds(embeddings, k, seed=0):
+    """Deterministic k-means++-style seeding: repeatedly take the least similar point"""
+    rng = np.random.default_rng(seed)
+    chosen = [int(rng.integers(len(embeddings)))]
+    best = embeddings @ embeddings[chosen[0]]
+    for _ in range(1, k):
+        nxt = int(np.argmin(best))
+        chosen.append(nxt)
+        best = np.maximum(best, embeddings @ embeddings[nxt])
+    return embeddings[chosen]
+
+
+class Cluster:
+    """One node of the hierarchy"""
+
+    def __init__(self, cluster_id, level, members, centroid, parent=None):
+        self.id = cluster_id
+        self.level = level
+        self.members = members  # Store rows, sorted
+        self.centroid = centroid
+        self.parent = parent
+        self.children = []
+
+
+class ClusterHierarchy:
+    """Multi-level clustering of a CourseStore's embeddings"""
+
+    def __init__(self, store, leaf_size=40, branching=8, max_levels=4, iterations=10):
+        self.store = store
+        self.clusters = {}
+        self.levels = []
+
+        embeddings = store.embeddings
+        if len(store) == 0:
+            return
+
+        # Level 0: one seed per department, refined by k-means
+        seeds = np.zeros((len(store.department_names), embeddings.shape[1]), dtype=np.float32)
+        np.add.at(seeds, store.department_codes, embeddings)
+        labels, centroids = spherical_kmeans(embeddings, seeds, iterations)
+        self.levels.append(self._make_level(0, np.arange(len(store)), labels, centroids, None))
+
+        # Split large clusters level by level
+        for level in range(1, max_levels):
+            next_level = []
+            for cluster in self.levels[-1]:
+                size = len(cluster.members)
+                if size <= leaf_size:
+                    continue
+                k = int(min(branching, np.ceil(size / leaf_size)))
+                member_embeddings = embeddings[cluster.members]
+                seeds = farthest_point_seeds(member_embeddings, k, seed=level)
+                labels, centroids = spherical_kmeans(member_embeddings, seeds, iterations)
+                if len(centroids) < 2:
+                    continue
+                children = self._make_level(level, cluster.members, labels, centroids, cluster)
+                cluster.children = children
+                next_level.extend(children)
+            if not next_level:
+                break
+            self.levels.append(next_level)
+
+    def _make_level(self, level, rows, labels, centroids, parent):
+        clusters = []
+        prefix = parent.id if parent is not None else "cluster"
+        for index in range(len(centroids)):
+            members = np.sort(rows[labels == index])
+            cluster = Cluster(f"{prefix}-{index}", level, members, centroids[index], parent)
+            self.clusters[cluster.id] = cluster
+            clusters.append(cluster)
+        return clusters
+
+    def summary(self, cluster):
+        """
+        Super-node fields for the graph: size, dominant department, central
+        courses. Courses removed since the hierarchy was built are left out,
+        as in expand().
+        """
+        store = self.store
+        members = cluster.members[store.alive[cluster.members]]
+        codes = store.department_codes[members]
+        dominant = store.department_names[int(np.bincount(codes).argmax())] if len(codes) else ""
+        centrality = store.embeddings[members] @ cluster.centroid
+        central = members[np.argsort(-centrality)[:3]]
+        top_names = [store.names[row] for row in central]
+        return {
+            'id': cluster.id,
+            'type': 'cluster',
+            'level': cluster.level,
+            'label': f"{dominant or 'Other'}: {top_names[0]}" if top_names else (dominant or 'Other'),
+            'department': dominant,
+            'size': int(len(members)),
+            'top_courses': top_names,
+            'leaf': not cluster.children,
+        }
+
+    def centroid_similarities(self, clusters):
+        """Cosine similarity between cluster centroids, keyed "id1,id2" in both directions"""
+        if not clusters:
+            return {}
+        centroids = np.vstack([cluster.centroid for cluster in clusters])
+        matrix = (centroids @ centroids.T).tolist()
+        similarities = {}
+        for i, a in enumerate(clusters):
+            for j in range(i + 1, len(clusters)):
+                b = clusters[j]
+                similarities[f"{a.id},{b.id}"] = matrix[i][j]
+                similarities[f"{b.id},{a.id}"] = matrix[i][j]
+        return similarities
+
+    def member_similarities(self, rows):
+        """Pairwise similarities among a set of store rows, keyed by course id"""
+        ids = [self.store.ids[row] for row in rows]
+        vectors = self.store.embeddings[rows]
+        matrix = (vectors @ vectors.T).tolist()
+        similarities = {}
+        for i in range(len(ids)):
+            for j in range(i + 1, len(ids)):
+                similarities[f"{ids[i]},{ids[j]}"] = matrix[i][j]
+                similarities[f"{ids[j]},{ids[i]}"] = matrix[i][j]
+        return similarities
+
+    def level_view(self, level):
+        """Super-nodes and centroid similarities for one level of the hierarchy"""
+        level = max(0, min(level, len(self.levels) - 1))
+        clusters = self.levels[level]
+        return level, [self.summary(c) for c in clusters], self.centroid_similarities(clusters)
+
+    def node_vectors(self, node_ids):
+        """
+        Graph nodes that still exist, with their vectors: centroids for
+        cluster ids, embeddings for live course ids. Unknown ids are skipped.
+        """
+        store = self.store
+        kept = []
+        vectors = []
+        for node_id in node_ids:
+            cluster = self.clusters.get(node_id)
+            if cluster is not None:
+                kept.append(node_id)
+                vectors.append(cluster.centroid)
+                continue
+            row = store.row_of.get(node_id)
+            if row is not None:
+                kept.append(node_id)
+                vectors.append(store.embeddings[row])
+        if not vectors:
+            return kept, np.zeros((0, store.embeddings.shape[1]), dtype=np.float32)
+        return kept, np.vstack(vectors)
+
+    def cross_similarities(self, node_ids, vectors, visible):
+        """Similarities between new nodes and the visible ones, keyed "id1,id2" in both directions"""
+        new_ids = set(node_ids)
+        visible_ids, visible_vectors = self.node_vectors([v for v in visible if v not in new_ids])
+        if not visible_ids or not len(node_ids):
+            return {}
+        matrix = (vectors @ visible_vectors.T).tolist()
+        similarities = {}
+        for i, a in enumerate(node_ids):
+            for j, b in enumerate(visible_ids):
+                similarities[f"{a},{b}"] = matrix[i][j]
+                similarities[f"{b},{a}"] = matrix[i][j]
+        return similarities
+
+    def expand(self, cluster_id, visible=()):
+        """
+        The next level down for one cluster: its child clusters, or its member
+        courses when it is a leaf. Returns None for unknown ids.
+
+        visible lists the ids of nodes the client still shows (other clusters
+        and courses from earlier expansions); the similarities then also link
+        the new nodes to them, so an expanded cluster stays connected to the
+        rest of the graph.
+
+        The hierarchy is built at startup: courses removed since then are
+        left out, courses added since then only appear in the full graph.
+        """
+        cluster = self.clusters.get(cluster_id)
+        if cluster is None:
+            return None
+        if cluster.children:
+            nodes = [self.summary(c) for c in cluster.children]
+            similarities = self.centroid_similarities(cluster.children)
+            vectors = np.vstack([c.centroid for c in cluster.children])
+        else:
+            members = cluster.members[self.store.alive[cluster.members]]
+            nodes = [dict(self.store.course(int(row)), type='course') for row in members]
+            similarities = self.member_similarities(members)
+            vectors = self.store.embeddings[members]
+        visible = [node_id for node_id in visible if node_id != cluster_id]
+        similarities.update(self.cross_similarities([node['id'] for node in nodes], vectors, visible))
+        return nodes, similarities
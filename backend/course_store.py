@@ -0,0 +1,391 @@
+"""
+Columnar in-memory course table.
+
+Courses are kept as parallel columns rather than one dict per course:
+
+- one contiguous float32 matrix of L2-normalized embeddings (row = course)
+- string columns with repeated values (department, faculty, delivery, dates) interned
+- integer-coded departments, with rows sorted by department so each
+  department is one contiguous row range
+- an id -> row map for O(1) lookups
+- optional top-k neighbour lists per course (see build_neighbours)
+
+Courses can be added, edited and removed after loading (add/update/remove).
+New rows are appended to over-allocated buffers, removed rows are only
+flagged, and a department whose row range no longer matches exactly is
+answered from an explicit row list until the next reload.
+"""
+import sys
+
+import numpy as np
+
+
+def _intern(value):
+    return sys.intern(value) if value else ""
+
+
+def _intern_section(section):
+    return {key: _intern(value) for key, value in section.items()}
+
+
+class CourseStoreBuilder:
+    """Accumulates courses row by row while a CSV is parsed"""
+
+    def __init__(self):
+        self.rows = []
+        self.embeddings = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, course_id, code, name, department, description, section, embedding):
+        """Add a course with its first section; returns the builder row index"""
+        self.rows.append({
+            'id': course_id,
+            'code': code,
+            'name': name,
+            'department': _intern(department),
+            'description': description,
+            'sections': [_intern_section(section)],
+        })
+        self.embeddings.append(np.asarray(embedding, dtype=np.float32))
+        return len(self.rows) - 1
+
+    def add_section(self, index, section):
+        """Attach another section to a course that is already added"""
+        self.rows[index]['sections'].append(_intern_section(section))
+
+    def build(self):
+        """Sort rows by department and pack them into a CourseStore"""
+        order = sorted(range(len(self.rows)), key=lambda i: (self.rows[i]['department'], i))
+        rows = [self.rows[i] for i in order]
+        if self.embeddings:
+            embeddings = np.vstack([self.embeddings[i] for i in order])
+        else:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.rows = []
+        self.embeddings = []
+        return CourseStore(rows, embeddings)
+
+
+def _append_row(buffer, count, value):
+    """Write value at row `count`, doubling the buffer when it is full; returns the buffer"""
+    if count >= len(buffer):
+        grown = np.zeros((max(16, 2 * len(buffer)),) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:count] = buffer[:count]
+        buffer = grown
+    buffer[count] = value
+    return buffer
+
+
+def join_faculty(sections):
+    """Unique faculty names across sections, in order of appearance"""
+    names = []
+    for section in sections:
+        if section['faculty'] and section['faculty'] not in names:
+            names.append(section['faculty'])
+    return ", ".join(names)
+
+
+class CourseStore:
+    """Read-mostly columnar store of courses and their embeddings"""
+
+    def __init__(self, rows, embeddings):
+        self.ids = [row['id'] for row in rows]
+        self.codes = [row['code'] for row in rows]
+        self.names = [row['name'] for row in rows]
+        self.descriptions = [row['description'] for row in rows]
+        self.sections = [tuple(row['sections']) for row in rows]
+        self.faculty = [_intern(join_faculty(row['sections'])) for row in rows]
+
+        # Integer-coded departments; rows arrive sorted by department
+        self.department_names = sorted({row['department'] for row in rows})
+        codes = {name: code for code, name in enumerate(self.department_names)}
+        self.department_codes = np.array([codes[row['department']] for row in rows], dtype=np.int32)
+        self.department_lookup = {name.lower(): code for name, code in codes.items()}
+        self.department_ranges = {}
+        for code in range(len(self.department_names)):
+            rows_in_dept = np.flatnonzero(self.department_codes == code)
+            self.department_ranges[code] = (int(rows_in_dept[0]), int(rows_in_dept[-1]) + 1)
+
+        # Normalized once so cosine similarity is a dot product
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.size:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings /= norms
+        self.embeddings = embeddings
+
+        self.row_of = {course_id: row for row, course_id in enumerate(self.ids)}
+        self._nodes = None
+
+        # Top-k most similar rows per course, best first (filled by build_neighbours)
+        self.neighbour_rows = np.zeros((len(self.ids), 0), dtype=np.int32)
+        self.neighbour_scores = np.zeros((len(self.ids), 0), dtype=np.float32)
+
+        # Live edits: removed rows stay in place with alive=False, and rows that
+        # sit outside their department's range are listed per department code
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self.removed = 0
+        self.department_extra = {}
+        self._irregular = set()  # Department codes whose range is not exact
+
+        # Row buffers the public arrays are views of; appends grow them by doubling
+        self._buffers = {
+            'embeddings': self.embeddings,
+            'department_codes': self.department_codes,
+            'alive': self.alive,
+            'neighbour_rows': self.neighbour_rows,
+            'neighbour_scores': self.neighbour_scores,
+        }
+
+    def __len__(self):
+        """Number of rows, including removed ones"""
+        return len(self.ids)
+
+    def live_count(self):
+        return len(self) - self.removed
+
+    def department(self, row):
+        return self.department_names[self.department_codes[row]]
+
+    def departments(self):
+        """Sorted non-empty names of departments that still have live courses"""
+        codes = self.department_codes if not self.removed else self.department_codes[self.alive]
+        used = np.flatnonzero(np.bincount(codes, minlength=len(self.department_names)))
+        return sorted(name for name in (self.department_names[code] for code in used.tolist()) if name)
+
+    def rows_for_department(self, department=None):
+        """
+        Live rows of a department (case-insensitive), all live rows if None.
+
+        A slice while the department's row range is exact, otherwise an
+        array of row numbers; either can index the column arrays.
+        """
+        if not department:
+            if not self.removed:
+                return slice(0, len(self))
+            return np.flatnonzero(self.alive)
+        code = self.department_lookup.get(department.lower())
+        if code is None:
+            return slice(0, 0)
+        lo, hi = self.department_ranges[code]
+        if code not in self._irregular:
+            return slice(lo, hi)
+        extra = sorted(self.department_extra.get(code, ()))
+        rows = np.concatenate([np.arange(lo, hi), np.asarray(extra, dtype=np.intp)])
+        return rows[(self.department_codes[rows] == code) & self.alive[rows]]
+
+    def department_codes_for(self, departments):
+        """Department codes for a list of names (case-insensitive); unknown names are ignored"""
+        codes = [self.department_lookup.get(name.lower()) for name in departments or []]
+        return [code for code in codes if code is not None]
+
+    def build_neighbours(self, k, block_rows=1024):
+        """Precompute each course's k most similar other courses"""
+        n = len(self)
+        k = max(0, min(k, n - 1))
+        self.neighbour_rows = self._buffers['neighbour_rows'] = np.zeros((n, k), dtype=np.int32)
+        self.neighbour_scores = self._buffers['neighbour_scores'] = np.zeros((n, k), dtype=np.float32)
+        if k == 0:
+            return
+
+        for start in range(0, n, block_rows):
+            rows = np.arange(start, min(start + block_rows, n))
+            self._set_neighbours(rows, self.embeddings[rows] @ self.embeddings.T)
+
+    def _set_neighbours(self, rows, block):
+        """Fill the neighbour lists of rows from their similarity rows (block is overwritten)"""
+        k = self.neighbour_rows.shape[1]
+        block[np.arange(len(rows)), rows] = -np.inf  # A course is not its own neighbour
+        if self.removed:
+            block[:, ~self.alive] = -np.inf
+
+        best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(block, best, axis=1)
+        order = np.argsort(-scores, axis=1)
+        self.neighbour_rows[rows] = np.take_along_axis(best, order, axis=1)
+        self.neighbour_scores[rows] = np.take_along_axis(scores, order, axis=1)
+
+    def neighbours(self, row, k, include=None, exclude=None):
+        """
+        Up to k (row, score) pairs most similar to row, best first.
+
+        include/exclude are lists of department codes. Precomputed lists are
+        used when they hold enough matches; otherwise the allowed rows are
+        scored directly.
+        """
+        allowed = np.ones(len(self.department_names), dtype=bool)
+        if include:
+            allowed[:] = False
+            allowed[include] = True
+        if exclude:
+            allowed[exclude] = False
+
+        rows = self.neighbour_rows[row]
+        keep = allowed[self.department_codes[rows]] & self.alive[rows] & (rows != row)
+        filtered = include or exclude or self.removed
+        if keep.sum() >= k or (not filtered and len(rows) >= min(k, len(self) - 1)):
+            rows = rows[keep][:k]
+            scores = self.neighbour_scores[row][keep][:k]
+            return list(zip(rows.tolist(), scores.tolist()))
+
+        # Not enough precomputed neighbours pass the filters: score allowed rows
+        candidates = np.flatnonzero(allowed[self.department_codes] & self.alive)
+        candidates = candidates[candidates != row]
+        if len(candidates) == 0:
+            return []
+        scores = self.embeddings[candidates] @ self.embeddings[row]
+        k = min(k, len(candidates))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return list(zip(candidates[best].tolist(), scores[best].tolist()))
+
+    def course(self, row):
+        """Course fields for API responses (without the embedding)"""
+        return {
+            'id': self.ids[row],
+            'code': self.codes[row],
+            'name': self.names[row],
+            'department': self.department(row),
+            'faculty': self.faculty[row],
+            'description': self.descriptions[row],
+            'sections': list(self.sections[row]),
+        }
+
+    def nodes(self):
+        """Graph nodes for every live course; built once and reused until the next edit"""
+        if self._nodes is None:
+            self._nodes = [self.course(row) for row in np.flatnonzero(self.alive).tolist()]
+        return self._nodes
+
+    def similarity_row(self, row):
+        """Cosine similarity of one course to every row; removed rows and itself score -inf"""
+        scores = self.embeddings @ self.embeddings[row]
+        scores[~self.alive] = -np.inf
+        scores[row] = -np.inf
+        return scores
+
+    def _department_code(self, department):
+        """Code for a department name, registering new departments"""
+        department = _intern(department)
+        code = self.department_lookup.get(department.lower())
+        if code is None:
+            code = len(self.department_names)
+            self.department_names.append(department)
+            self.department_lookup[department.lower()] = code
+            self.department_ranges[code] = (0, 0)
+        return code
+
+    def _place(self, row, code):
+        """Record that row now belongs to department code"""
+        lo, hi = self.department_ranges[code]
+        if not lo <= row < hi:
+            self.department_extra.setdefault(code, set()).add(row)
+            self._irregular.add(code)
+
+    def _normalized(self, embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def add(self, course_id, code, name, department, description, sections, embedding):
+        """
+        Append a course and insert it into other courses' neighbour lists.
+
+        Returns (row, scores): the new row and its similarity to every row.
+        """
+        row = len(self)
+        department_code = self._department_code(department)
+        buffers = self._buffers
+        buffers['embeddings'] = _append_row(buffers['embeddings'], row, self._normalized(embedding))
+        buffers['department_codes'] = _append_row(buffers['department_codes'], row, department_code)
+        buffers['alive'] = _append_row(buffers['alive'], row, True)
+        buffers['neighbour_rows'] = _append_row(buffers['neighbour_rows'], row, 0)
+        buffers['neighbour_scores'] = _append_row(buffers['neighbour_scores'], row, 0)
+
+        self.ids.append(course_id)
+        self.codes.append(code)
+        self.names.append(name)
+        self.descriptions.append(description)
+        self.sections.append(tuple(_intern_section(section) for section in sections))
+        self.faculty.append(_intern(join_faculty(sections)))
+        self._publish(row + 1)
+        self._place(row, department_code)
+        self.row_of[course_id] = row
+        self._nodes = None
+
+        scores = self.similarity_row(row)
+        self._refresh_neighbours(row, scores, holders=np.zeros(0, dtype=np.intp))
+        return row, scores
+
+    def update(self, row, code, name, department, description, sections, embedding=None):
+        """
+        Edit a course in place. With a new embedding, the neighbour lists that
+        involve it are refreshed and its new similarity row is returned;
+        otherwise returns None.
+        """
+        self.codes[row] = code
+        self.names[row] = name
+        self.descriptions[row] = description
+        self.sections[row] = tuple(_intern_section(section) for section in sections)
+        self.faculty[row] = _intern(join_faculty(sections))
+
+        department_code = self._department_code(department)
+        if department_code != self.department_codes[row]:
+            self._irregular.add(int(self.department_codes[row]))
+            self.department_codes[row] = department_code
+            self._place(row, department_code)
+        self._nodes = None
+
+        if embedding is None:
+            return None
+        self.embeddings[row] = self._normalized(embedding)
+        scores = self.similarity_row(row)
+        self._refresh_neighbours(row, scores, holders=self._holders(row))
+        return scores
+
+    def remove(self, row):
+        """Flag a course as removed and refill the neighbour lists that held it"""
+        holders = self._holders(row)
+        self.alive[row] = False
+        self.removed += 1
+        self._irregular.add(int(self.department_codes[row]))
+        del self.row_of[self.ids[row]]
+        self._nodes = None
+        if len(holders) and self.neighbour_rows.shape[1]:
+            self._set_neighbours(holders, self.embeddings[holders] @ self.embeddings.T)
+
+    def _publish(self, count):
+        """Point the public arrays at the first count rows of their buffers"""
+        for name, buffer in self._buffers.items():
+            setattr(self, name, buffer[:count])
+
+    def _holders(self, row):
+        """Live rows whose neighbour list contains row"""
+        if not self.neighbour_rows.shape[1]:
+            return np.zeros(0, dtype=np.intp)
+        holders = np.flatnonzero((self.neighbour_rows == row).any(axis=1) & self.alive)
+        return holders[holders != row]
+
+    def _refresh_neighbours(self, row, scores, holders):
+        """
+        Bring neighbour lists up to date after row's embedding changed: its
+        own list comes from scores, lists that held it are recomputed, and
+        every other list takes it in if it now beats that list's last entry.
+        """
+        k = self.neighbour_rows.shape[1]
+        if k == 0:
+            return
+        self._set_neighbours(np.array([row]), scores[np.newaxis, :].copy())
+        if len(holders):
+            self._set_neighbours(holders, self.embeddings[holders] @ self.embeddings.T)
+
+        better = np.flatnonzero(scores > self.neighbour_scores[:, -1])
+        better = np.setdiff1d(better, holders)
+        for other in better.tolist():
+            position = int(np.searchsorted(-self.neighbour_scores[other], -scores[other]))
+            self.neighbour_rows[other, position + 1:] = self.neighbour_rows[other, position:-1].copy()
+            self.neighbour_scores[other, position + 1:] = self.neighbour_scores[other, position:-1].copy()
+            self.neighbour_rows[other, position] = row
+            self.neighbour_scores[other, position] = scores[other]
@@ -0,0 +1,260 @@
+"""
+Export the course graph as a static bundle that a CDN can serve.
+
+The graph view only changes when the catalog does, so instead of asking a
+live backend for /api/graph-data on every visit, the frontend can load a
+prebuilt bundle (set VITE_GRAPH_BUNDLE_URL to its manifest):
+
+    python export_bundle.py ../data/course-embd-data-with-embeddings.csv -o ../frontend/public/graph
+
+Two files are written to the output directory:
+
+- graph-<hash>.json.gz: nodes, sparse similarity edges, a precomputed
+  layout, departments and a suggest index for the search box, as compact
+  column arrays, gzipped. <hash> is the SHA-256 of the uncompressed JSON,
+  so the file never changes and can be cached forever.
+- manifest.json: the current bundle's file name, version and sizes. It is
+  the only file that changes between exports and should be served with a
+  short cache lifetime.
+
+Layout: the embeddings' two principal components give a starting position
+that already groups similar courses, refined with force-directed
+(Fruchterman-Reingold) iterations over the exported edges.
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Version of the bundle layout; bump when the frontend must read it differently
+BUNDLE_FORMAT = 1
+
+# Positions are stored as integers in [-POSITION_SCALE, POSITION_SCALE]
+POSITION_SCALE = 10000
+# Similarities are stored as integers in thousandths
+SIMILARITY_SCALE = 1000
+
+# Name words too common to be useful suggestions on their own
+SUGGEST_STOPWORDS = frozenset("a an and as at by for from in into of on or the to with".split())
+
+
+def sparse_edges(store, rows, per_node, min_similarity):
+    """
+    Each course's per_node most similar courses above min_similarity, once per pair.
+
+    Returns:
+        (sources, targets, similarities): positions in rows, with sources < targets
+    """
+    store.build_neighbours(per_node)
+    position = np.full(len(store), -1, dtype=np.int64)
+    position[rows] = np.arange(len(rows))
+
+    sources = np.repeat(position[rows], store.neighbour_rows.shape[1])
+    targets = position[store.neighbour_rows[rows].ravel()]
+    scores = store.neighbour_scores[rows].ravel()
+    keep = (targets >= 0) & (scores >= min_similarity) & (sources != targets)
+    sources, targets, scores = sources[keep], targets[keep], scores[keep]
+
+    # A pair listed by both courses becomes one edge
+    low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+    _, first = np.unique(low * len(rows) + high, return_index=True)
+    return low[first], high[first], scores[first]
+
+
+def principal_positions(embeddings, seed=42, iterations=20):
+    """Project embeddings onto their top two principal components (subspace iteration)"""
+    centered = embeddings - embeddings.mean(axis=0)
+    basis = np.random.default_rng(seed).standard_normal((embeddings.shape[1], 2))
+    for _ in range(iterations):
+        basis, _ = np.linalg.qr(centered.T @ (centered @ basis))
+    positions = centered @ basis
+    # Fix each axis' sign so repeated exports agree
+    signs = np.sign(positions[np.abs(positions).argmax(axis=0), [0, 1]])
+    signs[signs == 0] = 1
+    return positions * signs
+
+
+def force_layout(positions, sources, targets, weights, iterations=100, gravity=0.05, block_rows=1024):
+    """
+    Fruchterman-Reingold refinement of positions: every pair of nodes
+    repels, edges attract in proportion to their weight, and a weak gravity
+    keeps disconnected courses nearby. Repulsion is computed in blocks of
+    rows to bound memory at O(block_rows * n).
+    """
+    n = len(positions)
+    if n < 2 or iterations <= 0:
+        return positions
+    positions = positions.astype(np.float64)
+    # Ideal edge length 1: spread the start over an area of about n
+    spread = np.abs(positions).max() or 1.0
+    positions = positions / spread * np.sqrt(n) / 2
+    temperature = np.sqrt(n) / 10
+
+    for step in range(iterations):
+        # Repulsion of node i: sum over j of (p_i - p_j) / |p_i - p_j|^2, as matrix products
+        displacement = np.zeros_like(positions)
+        squared = (positions ** 2).sum(axis=1)
+        for start in range(0, n, block_rows):
+            block = positions[start:start + block_rows]
+            distance2 = squared[start:start + block_rows, None] + squared[None, :] - 2 * block @ positions.T
+            inverse = 1 / np.maximum(distance2, 1e-4)
+            inverse[np.arange(len(block)), np.arange(start, start + len(block))] = 0
+            displacement[start:start + block_rows] = block * inverse.sum(axis=1)[:, None] - inverse @ positions
+
+        delta = positions[sources] - positions[targets]
+        pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) * weights)[:, None]
+        for axis in (0, 1):
+            displacement[:, axis] -= np.bincount(sources, pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(targets, pull[:, axis], minlength=n)
+        displacement -= gravity * positions
+
+        # Move at most the current temperature, which cools linearly
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 1e-9)
+        limit = temperature * (1 - step / iterations)
+        positions += displacement * (np.minimum(length, limit) / length)[:, None]
+    return positions
+
+
+def suggest_index(names, codes):
+    """
+    Sorted (key, node) pairs for prefix lookups: each course's lowercased
+    name and code, and the name from each later significant word on, so
+    "ecol" finds "Intro to Ecology".
+    """
+    entries = set()
+    for node, (name, code) in enumerate(zip(names, codes)):
+        name = name.lower().strip()
+        if code.strip():
+            entries.add((code.lower().strip(), node))
+        if not name:
+            continue
+        entries.add((name, node))
+        for match in re.finditer(r"\b\w+", name):
+            if match.start() > 0 and match.group() not in SUGGEST_STOPWORDS:
+                entries.add((name[match.start():], node))
+    entries = sorted(entries)
+    return [key for key, _ in entries], [node for _, node in entries]
+
+
+def build_bundle(store, edges_per_node=15, min_similarity=0.3, layout_iterations=100, seed=42):
+    """The bundle contents for every live course in a CourseStore"""
+    rows = np.flatnonzero(store.alive)
+    nodes = [store.course(row) for row in rows.tolist()]
+    sources, targets, similarities = sparse_edges(store, rows, edges_per_node, min_similarity)
+
+    positions = principal_positions(store.embeddings[rows].astype(np.float64), seed)
+    positions = force_layout(positions, sources, targets, similarities.astype(np.float64), layout_iterations)
+    positions -= positions.mean(axis=0)
+    positions = np.round(positions / (np.abs(positions).max() or 1.0) * POSITION_SCALE).astype(np.int64)
+
+    departments = sorted({node['department'] for node in nodes})
+    department_index = {name: i for i, name in enumerate(departments)}
+    names = [node['name'] for node in nodes]
+    codes = [node['code'] for node in nodes]
+    suggest_keys, suggest_nodes = suggest_index(names, codes)
+
+    return {
+        "format": BUNDLE_FORMAT,
+        "departments": departments,
+        "nodes": {
+            "id": [node['id'] for node in nodes],
+            "code": codes,
+            "name": names,
+            "department": [department_index[node['department']] for node in nodes],
+            "faculty": [node['faculty'] for node in nodes],
+            "x": positions[:, 0].tolist(),
+            "y": positions[:, 1].tolist(),
+        },
+        "edges": {
+            "source": sources.tolist(),
+            "target": targets.tolist(),
+            "similarity": np.round(similarities * SIMILARITY_SCALE).astype(np.int64).tolist(),
+        },
+        "suggest": {"key": suggest_keys, "node": suggest_nodes},
+    }
+
+
+def write_bundle(bundle, output_dir, keep=3, shard=None, source=None):
+    """
+    Write the content-hashed bundle, then point manifest.json at it.
+
+    Bundles beyond the `keep` most recent are deleted; older ones stay so
+    pages still holding an earlier manifest can finish loading.
+    Returns the manifest.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    payload = json.dumps(bundle, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    version = hashlib.sha256(payload).hexdigest()[:16]
+    filename = f"graph-{version}.json.gz"
+    path = os.path.join(output_dir, filename)
+    if not os.path.exists(path):
+        # mtime=0 keeps the compressed bytes identical across exports too
+        compressed = gzip.compress(payload, compresslevel=9, mtime=0)
+        with open(path + ".tmp", 'wb') as f:
+            f.write(compressed)
+        os.replace(path + ".tmp", path)
+    os.utime(path)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "bundle": filename,
+        "shard": shard,
+        "source": os.path.basename(source) if source else None,
+        "nodes": len(bundle["nodes"]["id"]),
+        "edges": len(bundle["edges"]["source"]),
+        "bytes": os.path.getsize(path),
+        "uncompressed_bytes": len(payload),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    with open(manifest_path + ".tmp", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    bundles = sorted(glob.glob(os.path.join(output_dir, "graph-*.json.gz")), key=os.path.getmtime, reverse=True)
+    for old in bundles[max(1, keep):]:
+        os.remove(old)
+    return manifest
+
+
+def main(argv=None):
+    from main import find_default_csv, load_course_data
+
+    parser = argparse.ArgumentParser(description="Export a static, prebuilt graph bundle for CDN hosting")
+    parser.add_argument("csv_file", nargs="?", help="Embeddings CSV (default: the backend's default CSV)")
+    parser.add_argument("-o", "--output-dir", default="../frontend/public/graph",
+                        help="Directory for the bundle and manifest.json")
+    parser.add_argument("--shard", help="Shard name to record in the manifest")
+    parser.add_argument("--edges-per-node", type=int, default=15,
+                        help="Most similar courses each course is connected to")
+    parser.add_argument("--min-similarity", type=float, default=0.3,
+                        help="Weakest similarity that still gets an edge (the graph view's threshold)")
+    parser.add_argument("--layout-iterations", type=int, default=100, help="Force-directed refinement steps")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", type=int, default=3, help="Bundles to keep in the output directory")
+    args = parser.parse_args(argv)
+
+    csv_file = args.csv_file or find_default_csv()
+    if csv_file is None or not os.path.exists(csv_file):
+        parser.error("course data CSV not found")
+    store = load_course_data(csv_file)
+    if not len(store):
+        parser.error(f"no courses with embeddings in {csv_file}")
+
+    bundle = build_bundle(store, args.edges_per_node, args.min_similarity, args.layout_iterations, args.seed)
+    manifest = write_bundle(bundle, args.output_dir, args.keep, args.shard, csv_file)
+    print(f"Wrote {manifest['bundle']} ({manifest['nodes']} courses, {manifest['edges']} edges, "
+          f"{manifest['bytes'] / 1024:.1f} KB gzipped, {manifest['uncompressed_bytes'] / 1024:.1f} KB raw)")
+    print(f"Manifest: {os.path.join(args.output_dir, 'manifest.json')}")
+    return manifest
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Server-Sent Events fan-out for live graph updates.
+
+Every course edit is published as one small delta event with a
+monotonically increasing id. Each connected client has its own bounded
+queue; a short history lets a reconnecting client (which sends the
+Last-Event-ID header) catch up on what it missed. A client that falls too
+far behind, or reconnects after its last event left the history, is sent a
+"reset" event and should reload the full graph.
+
+All methods must be called from the event loop thread.
+"""
+import asyncio
+import json
+from collections import deque
+
+
+def format_event(event_id, kind, payload):
+    """One SSE message: id, event type and a single-line JSON data field"""
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+class GraphEvents:
+    """Publishes delta events to every subscribed SSE stream"""
+
+    def __init__(self, history=256, queue_size=64):
+        self.version = 0
+        self.history = deque(maxlen=history)  # (version, message)
+        self.queue_size = queue_size
+        self.subscribers = set()
+
+    def _reset_message(self):
+        return format_event(self.version, "reset", {"version": self.version})
+
+    def publish(self, kind, payload):
+        """Send an event to all subscribers; returns its version"""
+        self.version += 1
+        message = format_event(self.version, kind, dict(payload, version=self.version))
+        self.history.append((self.version, message))
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Client is not keeping up: drop its backlog and ask it to resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._reset_message())
+        return self.version
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a new stream. Returns (queue, backlog) where backlog holds
+        the messages the client missed since last_event_id, if any.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        backlog = []
+        if last_event_id:
+            try:
+                last = int(last_event_id)
+            except ValueError:
+                last = -1
+            oldest = self.history[0][0] if self.history else self.version + 1
+            if 0 <= last <= self.version and last + 1 >= oldest:
+                backlog = [message for version, message in self.history if version > last]
+            elif last != self.version:
+                backlog = [self._reset_message()]
+        self.subscribers.add(queue)
+        return queue, backlog
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
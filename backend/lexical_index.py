@@ -0,0 +1,74 @@
+"""
+BM25 keyword index over course names and descriptions.
+
+Used as a degraded search path when the encoder is overloaded: it needs no
+model and scores a query with a handful of vectorized array updates.
+"""
+import re
+import string
+from collections import Counter
+from math import log
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("a an and are as at be by for from in is it of on or that the to with".split())
+
+
+def tokenize(text):
+    text = text.lower().translate(str.maketrans(string.punctuation, " " * len(string.punctuation)))
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """Inverted index of a CourseStore's text, scored with BM25"""
+
+    def __init__(self, store, k1=1.2, b=0.75):
+        self.store = store
+        self.k1 = k1
+        self.b = b
+        n = len(store)
+
+        postings = {}
+        lengths = np.zeros(n, dtype=np.float32)
+        for row in range(n):
+            if not store.alive[row]:
+                continue
+            tokens = tokenize(f"{store.codes[row]} {store.names[row]} {store.names[row]} {store.descriptions[row]}")
+            lengths[row] = len(tokens)
+            for token, count in Counter(tokens).items():
+                postings.setdefault(token, ([], []))
+                postings[token][0].append(row)
+                postings[token][1].append(count)
+
+        live = max(1, store.live_count())
+        self.lengths = lengths
+        self.average_length = float(lengths.sum()) / live or 1.0
+        self.postings = {
+            token: (np.array(rows, dtype=np.int32), np.array(counts, dtype=np.float32),
+                    log(1 + (live - len(rows) + 0.5) / (len(rows) + 0.5)))
+            for token, (rows, counts) in postings.items()
+        }
+
+    def search(self, query_text, top_k=5, rows=None):
+        """Up to top_k (row, score) pairs for the query, best first; rows limits the candidates"""
+        scores = np.zeros(len(self.lengths), dtype=np.float32)
+        for token in set(tokenize(query_text)):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            matched, counts, idf = posting
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[matched] / self.average_length)
+            scores[matched] += idf * counts * (self.k1 + 1) / (counts + norm)
+
+        if rows is not None:
+            allowed = np.zeros(len(scores), dtype=bool)
+            allowed[rows] = True
+            scores[~allowed] = 0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) == 0 or top_k <= 0:
+            return []
+        k = min(top_k, len(candidates))
+        best = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        best = best[np.argsort(-scores[best])]
+        return list(zip(best.tolist(), scores[best].tolist()))
@@ -1,20 +1,36 @@
+import asyncio
+import heapq
 import json
 import csv
 import numpy as np
-import torch
 import time
 import os
-from tqdm import tqdm
 import re
 import string
-import requests
-from collections import Counter
+import subprocess
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from math import log
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-from sentence_transformers import SentenceTransformer
+import metrics
+import admission
+from course_store import CourseStoreBuilder
+from clustering import ClusterHierarchy
+from lexical_index import LexicalIndex
+from shards import SHARD_NAME, Shard, ShardSet
+import token_budget
+
+# The ML stack (torch, sentence_transformers) and the HTTP client for a remote
+# encoder are imported lazily, on the first query that needs them, so pods
+# that only serve graph data never load them.
 
 # Initialize FastAPI app
 app = FastAPI(title="Course Graph API")
@@ -33,37 +49,212 @@ class CourseSearchRequest(BaseModel):
     query: str
     top_k: Optional[int] = 5
     department: Optional[str] = None
+    shards: Optional[List[str]] = None  # Shards to search; all loaded shards if omitted
 
 class CourseMatch(BaseModel):
     score: float
+    id: str = ""
     code: str
     name: str
     description: str
     department: str
     faculty: str
+    sections: List[Dict] = []
+    shard: str = ""
 
 class CourseSearchResponse(BaseModel):
     results: List[CourseMatch]
     query_time: float
+    stages: Optional[Dict[str, float]] = None  # Per-stage seconds, only when tracing
+    degraded: Optional[str] = None  # "lexical" when answered without the encoder
+
+class SimilarCourse(BaseModel):
+    id: str
+    code: str
+    name: str
+    department: str
+    score: float
+
+class SimilarCoursesResponse(BaseModel):
+    course: SimilarCourse
+    similar: List[SimilarCourse]
 
 class GraphDataResponse(BaseModel):
     nodes: List[Dict]
     similarities: Dict[str, float]
     departments: List[str]
+    level: Optional[int] = None  # Hierarchy level of the nodes, for clustered views
+    levels: Optional[int] = None  # Number of levels in the cluster hierarchy
+    cluster: Optional[str] = None  # Cluster that was expanded, if any
+    version: int = 0  # Last graph event included in this data
+    shard: Optional[str] = None
+
+class CourseInput(BaseModel):
+    code: str
+    name: str
+    department: str = ""
+    description: str = ""
+    sections: List[Dict[str, str]] = []  # section, faculty, start_date, end_date, delivery
+    embedding: Optional[List[float]] = None  # Encoded from the text when omitted
+
+class CourseChangeResponse(BaseModel):
+    course: Dict
+    version: int  # Id of the graph event that announced the change
+
+class ShardInfo(BaseModel):
+    name: str
+    source: str
+    courses: int
+    departments: int
+    loaded_at: float
+    default: bool = False
+
+class ShardLoadRequest(BaseModel):
+    path: str  # Embeddings CSV, relative to SHARD_DATA_DIR
+
+class ClusterExpandRequest(BaseModel):
+    cluster: str
+    visible: List[str] = []  # Ids of the nodes the client still shows
 
 # Instructions for transformer model
 QUERY_INSTRUCTION = "Provide a concise and relevant answer to the question"
 PASSAGE_INSTRUCTION = "Provide information that would help answer questions"
 
+# Token budget for encoding search queries; longer queries are truncated
+QUERY_MAX_TOKENS = int(os.environ.get("QUERY_MAX_TOKENS", "512"))
+
+# Serving mode:
+#   "full"       - graph data and semantic search (default)
+#   "graph-only" - graph data only; search endpoints return 503
+SERVING_MODE = os.environ.get("SERVING_MODE", "full")
+
+# Base URL of a remote embedding server (embedding-server/server.py). When set,
+# queries are encoded remotely and the local model is never loaded.
+EMBEDDING_SERVER_URL = os.environ.get("EMBEDDING_SERVER_URL", "")
+
+# Admission control in front of the query encoder: at most
+# SEARCH_MAX_CONCURRENCY queries are encoded at once and SEARCH_MAX_QUEUE
+# more wait. Requests beyond that, or still waiting after SEARCH_TIMEOUT
+# seconds, get 503 with Retry-After (at least SEARCH_RETRY_AFTER seconds),
+# or keyword-only results when SEARCH_DEGRADE=lexical. Queries whose
+# embedding is cached never wait.
+SEARCH_MAX_CONCURRENCY = int(os.environ.get("SEARCH_MAX_CONCURRENCY", "1"))
+SEARCH_MAX_QUEUE = int(os.environ.get("SEARCH_MAX_QUEUE", "16"))
+SEARCH_TIMEOUT = float(os.environ.get("SEARCH_TIMEOUT", "10"))
+SEARCH_RETRY_AFTER = int(os.environ.get("SEARCH_RETRY_AFTER", "1"))
+SEARCH_DEGRADE = os.environ.get("SEARCH_DEGRADE", "off")
+
+# Neighbours precomputed per course for /api/courses/{id}/similar
+NEIGHBOUR_K = int(os.environ.get("NEIGHBOUR_K", "50"))
+
+# Cluster hierarchy for level-of-detail graph views: clusters larger than
+# CLUSTER_LEAF_SIZE courses are split into up to CLUSTER_BRANCHING children
+CLUSTER_LEAF_SIZE = int(os.environ.get("CLUSTER_LEAF_SIZE", "40"))
+CLUSTER_BRANCHING = int(os.environ.get("CLUSTER_BRANCHING", "8"))
+
+# Live graph updates: edges at or above this similarity are sent in delta
+# events (the frontend draws the same threshold), and a client is sent a
+# keep-alive comment after this many idle seconds
+DELTA_EDGE_THRESHOLD = float(os.environ.get("DELTA_EDGE_THRESHOLD", "0.3"))
+EVENT_KEEPALIVE_SECONDS = 15
+
+# Dataset shards (e.g. one per term or campus) loaded at startup, as
+# "name=path,name=path". Without it the single default CSV is loaded as the
+# shard "default". Requests that name no shard use DEFAULT_SHARD, or the
+# first shard loaded. Shards loaded at runtime (PUT /api/shards/{name})
+# must come from SHARD_DATA_DIR.
+COURSE_SHARDS = os.environ.get("COURSE_SHARDS", "")
+DEFAULT_SHARD = os.environ.get("DEFAULT_SHARD") or None
+SHARD_DATA_DIR = os.environ.get("SHARD_DATA_DIR", "../data")
+
+# Worker threads a search fans out to, one shard per task (numpy releases
+# the GIL while scoring, so shards are scored in parallel)
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", str(min(8, os.cpu_count() or 1))))
+
 # Initialize global variables
-courses = []
-pairwise_similarities = {}  # Will store pre-calculated similarities
+shards = ShardSet(DEFAULT_SHARD)  # Loaded datasets: store, similarities, clusters, events
 model = None  # Will hold the SentenceTransformer model for query embedding
+search_pool = ThreadPoolExecutor(max_workers=max(1, SEARCH_WORKERS), thread_name_prefix="shard-search")
+
+# Most recent query embeddings, keyed by query text (0 disables the cache)
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", "256"))
+query_cache = OrderedDict()
+query_cache_lock = threading.Lock()
+
+# The local model encodes one text at a time. Admission control already times
+# the wait for a slot as "queue_wait"; waiting for the lock itself (when
+# SEARCH_MAX_CONCURRENCY is above one, or a course is being encoded) is
+# "encoder_lock_wait"
+encoder_lock = threading.Lock()
+
+search_admission = admission.AdmissionController(
+    "course_search",
+    max_concurrency=SEARCH_MAX_CONCURRENCY,
+    max_queue=SEARCH_MAX_QUEUE,
+    timeout=SEARCH_TIMEOUT,
+    retry_after=SEARCH_RETRY_AFTER
+)
+
+# Metrics exposed on /metrics
+SEARCH_REQUESTS = metrics.REGISTRY.counter(
+    "course_search_requests_total", "Search requests by endpoint and outcome", ["endpoint", "status"])
+SEARCH_LATENCY = metrics.REGISTRY.histogram(
+    "course_search_seconds", "End-to-end search latency")
+SEARCH_STAGE_LATENCY = metrics.REGISTRY.histogram(
+    "course_search_stage_seconds", "Search latency per stage", ["stage"])
+QUERY_CACHE_REQUESTS = metrics.REGISTRY.counter(
+    "course_query_cache_requests_total", "Query embedding cache lookups", ["result"])
+ENCODE_BATCH_SIZE = metrics.REGISTRY.histogram(
+    "course_encode_batch_size", "Texts per encoder call", buckets=metrics.SIZE_BUCKETS)
+GRAPH_DATA_REQUESTS = metrics.REGISTRY.counter(
+    "course_graph_data_requests_total", "Graph data requests")
+GRAPH_DATA_LATENCY = metrics.REGISTRY.histogram(
+    "course_graph_data_seconds", "Time to build the graph data response")
+DATASET_COURSES = metrics.REGISTRY.gauge(
+    "course_dataset_courses", "Courses loaded", ["shard"])
+DATASET_PAIRS = metrics.REGISTRY.gauge(
+    "course_dataset_similarity_pairs", "Pre-calculated pairwise similarities (both directions)", ["shard"])
+SEARCH_SHARDS = metrics.REGISTRY.histogram(
+    "course_search_shards", "Shards a search fans out to", buckets=metrics.SIZE_BUCKETS)
+COURSE_CHANGES = metrics.REGISTRY.counter(
+    "course_changes_total", "Courses added, updated or removed at runtime", ["kind"])
+GRAPH_EVENT_CLIENTS = metrics.REGISTRY.gauge(
+    "course_graph_event_clients", "Connected /api/graph-events streams")
+
+# Fields that identify one logical course; sections sharing them are merged
+def course_key(row):
+    """Canonical key for a CSV row: (code, name, description)"""
+    return (
+        row[0].strip(),
+        row[1].strip(),
+        row[12].strip() if len(row) > 12 else ""
+    )
+
+def section_from_row(row):
+    """Extract the per-section fields (faculty, schedule, delivery) from a CSV row"""
+    faculty_first = row[7] if len(row) > 7 else ""
+    faculty_last = row[8] if len(row) > 8 else ""
+    return {
+        'section': row[6] if len(row) > 6 else "",
+        'faculty': f"{faculty_first} {faculty_last}".strip(),
+        'start_date': row[2] if len(row) > 2 else "",
+        'end_date': row[3] if len(row) > 3 else "",
+        'delivery': row[11] if len(row) > 11 else ""
+    }
 
 # Load courses with embeddings
 def load_course_data(csv_file):
-    courses = []
+    """
+    Load courses from the embeddings CSV into a CourseStore, merging sections of the same course.
+
+    The CSV has one row per section. Rows that share code, name and
+    description become one course with a 'sections' list; only the first
+    row's embedding is parsed.
+    """
+    builder = CourseStoreBuilder()
+    rows_by_key = {}
     courses_without_embeddings = 0
+    section_rows = 0
     
     try:
         with open(csv_file, 'r', encoding='utf-8') as f:
@@ -78,6 +269,16 @@ def load_course_data(csv_file):
             for i, row in enumerate(reader):
                 # Make sure the row has enough columns
                 if len(row) > embedding_index:
+                    section = section_from_row(row)
+                    key = course_key(row)
+                    
+                    # Another section of a course we already have
+                    existing = rows_by_key.get(key)
+                    if existing is not None:
+                        builder.add_section(existing, section)
+                        section_rows += 1
+                        continue
+                    
                     # Try to parse the embedding JSON
                     try:
                         embedding = json.loads(row[embedding_index])
@@ -87,218 +288,765 @@ def load_course_data(csv_file):
                             courses_without_embeddings += 1
                             continue
                         
-                        faculty_first = row[7] if len(row) > 7 else ""
-                        faculty_last = row[8] if len(row) > 8 else ""
-                        
                         # Add course with a unique ID
-                        course_data = {
-                            'id': f"course-{i}",  # Unique ID for references
-                            'code': row[0],
-                            'name': row[1],
-                            'start_date': row[2] if len(row) > 2 else "",
-                            'end_date': row[3] if len(row) > 3 else "",
-                            'section': row[6] if len(row) > 6 else "",
-                            'faculty': f"{faculty_first} {faculty_last}".strip(),
-                            'department': row[10] if len(row) > 10 else "",
-                            'delivery': row[11] if len(row) > 11 else "",
-                            'description': row[12] if len(row) > 12 else "",
-                            'embedding': embedding
-                        }
-                        courses.append(course_data)
+                        rows_by_key[key] = builder.add(
+                            f"course-{i}",  # Unique ID for references
+                            row[0],
+                            row[1],
+                            row[10] if len(row) > 10 else "",
+                            row[12] if len(row) > 12 else "",
+                            section,
+                            embedding
+                        )
                     except json.JSONDecodeError:
                         print(f"Warning: Could not parse embedding for course {row[0]}")
                         courses_without_embeddings += 1
         
-        print(f"Loaded {len(courses)} courses from {csv_file}")
+        print(f"Loaded {len(builder)} courses from {csv_file}")
+        if section_rows > 0:
+            print(f"Merged {section_rows} additional sections into existing courses")
         if courses_without_embeddings > 0:
             print(f"Skipped {courses_without_embeddings} courses with missing or invalid embeddings")
     except Exception as e:
         print(f"Error loading course data: {e}")
-    return courses
+    return builder.build()
 
-# Calculate cosine similarity between two vectors
-def cosine_similarity(vec1, vec2):
-    """Calculate cosine similarity between two vectors"""
-    if not vec1 or not vec2:
-        return 0
-    
-    # Convert to numpy arrays for easier calculation
-    vec1 = np.array(vec1)
-    vec2 = np.array(vec2)
-    
-    # Calculate dot product
-    dot_product = np.dot(vec1, vec2)
-    
-    # Calculate magnitudes
-    magnitude1 = np.linalg.norm(vec1)
-    magnitude2 = np.linalg.norm(vec2)
-    
-    # Prevent division by zero
-    if magnitude1 == 0 or magnitude2 == 0:
-        return 0
-    
-    # Calculate cosine similarity
-    return dot_product / (magnitude1 * magnitude2)
+# Rows of the similarity matrix computed per block, to bound memory at O(block * n)
+SIMILARITY_BLOCK_ROWS = 1024
 
 # Pre-calculate all pairwise similarities between courses
-def calculate_pairwise_similarities():
-    """Pre-calculate similarities between all pairs of courses"""
-    global pairwise_similarities
+def calculate_pairwise_similarities(store):
+    """Pre-calculate similarities between all pairs of courses in a store"""
     pairwise_similarities = {}
     
+    from tqdm import tqdm
+    
     print("Pre-calculating pairwise similarities...")
-    total_pairs = (len(courses) * (len(courses) - 1)) // 2
+    n = len(store)
+    ids = store.ids
+    embeddings = store.embeddings
+    total_pairs = (n * (n - 1)) // 2
     
     # Use a progress bar for better visibility during initialization
     with tqdm(total=total_pairs) as pbar:
-        for i in range(len(courses)):
-            for j in range(i+1, len(courses)):  # Only calculate each pair once
-                course1 = courses[i]
-                course2 = courses[j]
-                
-                # Calculate similarity
-                similarity = cosine_similarity(course1['embedding'], course2['embedding'])
-                
-                # Store similarity (as a string key for JSON compatibility)
-                key = f"{course1['id']},{course2['id']}"
-                pairwise_similarities[key] = similarity
-                
-                # Also store the reverse direction with the same value
-                key_reverse = f"{course2['id']},{course1['id']}"
-                pairwise_similarities[key_reverse] = similarity
-                
-                pbar.update(1)
+        for block_start in range(0, n, SIMILARITY_BLOCK_ROWS):
+            # Embeddings are normalized, so one matrix product gives cosine similarities
+            block = embeddings[block_start:block_start + SIMILARITY_BLOCK_ROWS] @ embeddings.T
+            for offset, row in enumerate(block):
+                i = block_start + offset
+                id1 = ids[i]
+                scores = row.tolist()
+                for j in range(i + 1, n):  # Only calculate each pair once
+                    id2 = ids[j]
+                    similarity = scores[j]
+                    
+                    # Store similarity in both directions (string keys for JSON compatibility)
+                    pairwise_similarities[f"{id1},{id2}"] = similarity
+                    pairwise_similarities[f"{id2},{id1}"] = similarity
+                pbar.update(n - i - 1)
     
     print(f"Calculated {len(pairwise_similarities) // 2} unique pairwise similarities")
+    return pairwise_similarities
 
-# Extract all departments from courses
-def extract_departments():
-    """Get unique departments from all courses"""
-    departments = set()
-    for course in courses:
-        if course['department']:
-            departments.add(course['department'])
-    return sorted(list(departments))
-
-# Function to search courses using embeddings
-def search_courses(query_text, top_k=5, department=None):
-    """Search for courses semantically similar to the query"""
-    global model
-    start_time = time.time()
+def load_shard(name, csv_file):
+    """Load one dataset with its similarities, neighbour lists and cluster hierarchy"""
+    store = load_course_data(csv_file)
+    if not len(store):
+        return None
     
-    # Filter courses by department if specified
-    filtered_courses = courses
-    if department:
-        filtered_courses = [c for c in courses if c['department'].lower() == department.lower()]
+    # Calculate pairwise similarities and per-course neighbour lists
+    pairwise_similarities = calculate_pairwise_similarities(store)
+    store.build_neighbours(NEIGHBOUR_K)
     
-    # If no courses match the filter criteria
-    if len(filtered_courses) == 0:
-        return [], time.time() - start_time
+    # Cluster hierarchy for zoomed-out views
+    clusters = ClusterHierarchy(store, leaf_size=CLUSTER_LEAF_SIZE, branching=CLUSTER_BRANCHING)
+    print(f"Built cluster hierarchy with {len(clusters.levels)} levels "
+          f"({', '.join(str(len(level)) for level in clusters.levels)} clusters)")
     
-    # Generate query embedding
+    return Shard(name, csv_file, store, pairwise_similarities, clusters)
+
+def register_shard(shard):
+    """Make a loaded shard available; a shard it replaces tells its clients to reload"""
+    previous = shards.add(shard)
+    if previous is not None:
+        previous.events.publish("reset", {"shard": shard.name})
+    DATASET_COURSES.set(shard.store.live_count(), shard=shard.name)
+    DATASET_PAIRS.set(len(shard.pairwise_similarities), shard=shard.name)
+
+def search_enabled():
+    """Whether this process answers semantic search queries"""
+    return SERVING_MODE != "graph-only"
+
+def load_model():
+    """Load the SentenceTransformer model (and the ML stack) on first use"""
+    global model
     if model is None:
+        from sentence_transformers import SentenceTransformer
+        
         print("Loading SentenceTransformer model for query embedding...")
         model = SentenceTransformer('nvidia/NV-Embed-v2', trust_remote_code=True, device="cpu")
-        model.max_seq_length = 16384
+        model.max_seq_length = QUERY_MAX_TOKENS
         model.tokenizer.padding_side = "right"
+    return model
+
+def cached_query_embedding(query_text):
+    """Return the cached embedding for a query, or None"""
+    if QUERY_CACHE_SIZE <= 0:
+        return None
+    with query_cache_lock:
+        embedding = query_cache.get(query_text)
+        if embedding is not None:
+            query_cache.move_to_end(query_text)
+    QUERY_CACHE_REQUESTS.inc(result="hit" if embedding is not None else "miss")
+    return embedding
+
+def cache_query_embedding(query_text, embedding):
+    """Store a query embedding, evicting the least recently used one"""
+    if QUERY_CACHE_SIZE <= 0:
+        return
+    with query_cache_lock:
+        query_cache[query_text] = embedding
+        query_cache.move_to_end(query_text)
+        while len(query_cache) > QUERY_CACHE_SIZE:
+            query_cache.popitem(last=False)
+
+def encode_query(query_text, timer):
+    """Embed a search query, from the cache when possible"""
+    embedding = cached_query_embedding(query_text)
+    if embedding is not None:
+        return embedding
+    return embed_query(query_text, timer)
+
+def embed_query(query_text, timer):
+    """Encode a query with the remote encoder if configured, else the local model, and cache it"""
+    ENCODE_BATCH_SIZE.observe(1)
     
-    # Generate embedding for the query
+    if EMBEDDING_SERVER_URL:
+        import requests
+        
+        with timer.stage("encode"):
+            response = requests.post(
+                f"{EMBEDDING_SERVER_URL.rstrip('/')}/embed",
+                json={"texts": [query_text], "is_query": True},
+                timeout=SEARCH_TIMEOUT
+            )
+            if response.status_code == 503:
+                # The embedding server shed the request; pass its back-off on
+                retry_after = response.headers.get("Retry-After", "")
+                raise admission.Overloaded(
+                    "upstream", int(retry_after) if retry_after.isdigit() else SEARCH_RETRY_AFTER)
+            response.raise_for_status()
+            embedding = response.json()['embeddings'][0]
+        cache_query_embedding(query_text, embedding)
+        return embedding
+    
+    with timer.stage("encoder_lock_wait"):
+        encoder_lock.acquire()
     try:
+        if model is None:
+            with timer.stage("model_load"):
+                load_model()
+        
         # Add EOS token to input text
         input_text = query_text + model.tokenizer.eos_token
         
-        # Generate embedding with query instruction
-        with torch.no_grad():
-            query_embedding = model.encode(
+        # Generate embedding with query instruction (encode() runs without
+        # autograd itself, so torch is never imported here directly)
+        with timer.stage("encode"):
+            embedding = model.encode(
                 [input_text],
                 batch_size=1,
                 normalize_embeddings=True,
                 prompt=QUERY_INSTRUCTION
             )[0].tolist()
-    except Exception as e:
-        print(f"Error generating query embedding: {e}")
+    finally:
+        encoder_lock.release()
+    
+    cache_query_embedding(query_text, embedding)
+    return embedding
+
+def course_text(code, name, description):
+    """Text embedded for a course; matches scripts/generate_embeddings.py"""
+    return f"Course {code}: {name}\n\n{description}"
+
+def encode_passage(text):
+    """Embed a course text as a passage, remotely if configured, else with the local model"""
+    ENCODE_BATCH_SIZE.observe(1)
+    
+    if EMBEDDING_SERVER_URL:
+        import requests
+        
+        response = requests.post(
+            f"{EMBEDDING_SERVER_URL.rstrip('/')}/embed",
+            json={"texts": [text], "is_query": False},
+            timeout=60
+        )
+        response.raise_for_status()
+        return response.json()['embeddings'][0]
+    
+    with encoder_lock:
+        load_model()
+        # Chunk and pool exactly like generate_embeddings.py and the embedding
+        # server, within the query model's sequence limit, so long descriptions
+        # are not truncated
+        max_tokens = min(token_budget.MAX_TOKENS, model.max_seq_length)
+        return token_budget.encode_with_budget(model, [text], PASSAGE_INSTRUCTION, max_tokens)[0].tolist()
+
+# Function to search courses using embeddings
+def search_courses(query_text, top_k=5, department=None, timer=None, query_embedding=None, shard=None):
+    """
+    Search one shard (the default one if None) for courses semantically
+    similar to the query, encoding it unless query_embedding is given
+    """
+    if timer is None:
+        timer = metrics.StageTimer(SEARCH_STAGE_LATENCY)
+    start_time = time.time()
+    shard = shard or shards.get()
+    store = shard.store
+    
+    # Restrict to the department's row range if specified
+    with timer.stage("filter"):
+        rows = store.rows_for_department(department)
+        candidates = store.embeddings[rows]
+    
+    # If no courses match the filter criteria
+    if len(candidates) == 0:
         return [], time.time() - start_time
     
-    # Calculate similarity between query and all courses
-    similarity_scores = []
-    for i, course in enumerate(filtered_courses):
-        course_embedding = course['embedding']
-        similarity = cosine_similarity(query_embedding, course_embedding)
-        similarity_scores.append((i, similarity))
+    # Generate embedding for the query
+    if query_embedding is None:
+        try:
+            query_embedding = encode_query(query_text, timer)
+        except Exception as e:
+            print(f"Error generating query embedding: {e}")
+            return [], time.time() - start_time
+    
+    # Cosine similarity between the query and every candidate in one product
+    with timer.stage("score"):
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm > 0:
+            query_vector = query_vector / norm
+        scores = candidates @ query_vector
     
-    # Sort by similarity score (descending)
-    similarity_scores.sort(key=lambda x: x[1], reverse=True)
+    # Best top_k candidates, highest score first
+    with timer.stage("topk"):
+        k = len(scores) if top_k is None else max(0, min(top_k, len(scores)))
+        best = np.argpartition(-scores, k - 1)[:k] if k > 0 else np.array([], dtype=np.int64)
+        best = best[np.argsort(-scores[best])]
     
     # Get top-k matches
-    matches = []
-    for i, similarity in similarity_scores[:top_k]:
-        course = filtered_courses[i]
-        matches.append({
-            'score': similarity,
-            'code': course['code'],
-            'name': course['name'],
-            'description': course['description'],
-            'department': course['department'],
-            'faculty': course['faculty']
-        })
+    with timer.stage("response"):
+        matches = []
+        for i in best:
+            row = rows.start + int(i) if isinstance(rows, slice) else int(rows[i])
+            course = store.course(row)
+            course['score'] = float(scores[i])
+            course['shard'] = shard.name
+            matches.append(course)
     
     query_time = time.time() - start_time
     return matches, query_time
 
+def fan_out(search, selected, top_k):
+    """Run search(shard) for every selected shard on the worker pool and merge the best top_k"""
+    SEARCH_SHARDS.observe(len(selected))
+    if len(selected) == 1:
+        per_shard = [search(selected[0])]
+    else:
+        per_shard = list(search_pool.map(search, selected))
+    return heapq.nlargest(top_k, (match for matches in per_shard for match in matches),
+                          key=lambda match: match['score'])
+
+def search_shards(query_text, top_k, department, timer, query_embedding, selected):
+    """Semantic search across shards with one shared query embedding"""
+    if len(selected) == 1:
+        return fan_out(
+            lambda shard: search_courses(query_text, top_k, department, timer, query_embedding, shard)[0],
+            selected,
+            top_k
+        )
+    
+    # Shards are searched in parallel, so their stages overlap: each gets a
+    # private timer and only the wall time of the whole fan-out is recorded
+    with timer.stage("fanout"):
+        return fan_out(
+            lambda shard: search_courses(
+                query_text, top_k, department, metrics.StageTimer(None), query_embedding, shard)[0],
+            selected,
+            top_k
+        )
+
+def lexical_search(query_text, top_k=5, department=None, shard=None):
+    """Keyword (BM25) search over one shard's names and descriptions, for when the encoder is overloaded"""
+    shard = shard or shards.get()
+    store = shard.store
+    index = shard.lexical_index
+    if index is None:
+        index = shard.lexical_index = LexicalIndex(store)
+    
+    rows = None
+    if department:
+        rows = store.rows_for_department(department)
+        if not isinstance(rows, slice):
+            rows = rows[rows < len(index.lengths)]  # Courses added since the index was built
+    
+    matches = []
+    for row, score in index.search(query_text, top_k, rows):
+        course = store.course(row)
+        course['score'] = score
+        course['shard'] = shard.name
+        matches.append(course)
+    return matches
+
+def result_limit(top_k, selected):
+    """A request's top_k as a count: None means every course, a negative value none"""
+    if top_k is None:
+        return sum(shard.store.live_count() for shard in selected)
+    return max(0, top_k)
+
+def select_shards(names):
+    """Shards named in a request (all if none), or an HTTP error"""
+    try:
+        selected = shards.select(names)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown shard {e.args[0]}")
+    if not selected:
+        raise HTTPException(status_code=503, detail="No course data loaded")
+    return selected
+
+def shard_or_404(name):
+    """The named shard (the default one if None), or an HTTP error"""
+    shard = shards.get(name)
+    if shard is None:
+        raise HTTPException(status_code=404, detail=f"Unknown shard {name}" if name else "No course data loaded")
+    return shard
+
+async def run_search(request, raw_request, endpoint):
+    """Shared implementation of the search endpoints, with admission control, timing and metrics"""
+    if not search_enabled():
+        SEARCH_REQUESTS.inc(endpoint=endpoint, status="disabled")
+        raise HTTPException(status_code=503, detail="Search is disabled in graph-only mode")
+    
+    selected = select_shards(request.shards)
+    top_k = result_limit(request.top_k, selected)
+    timer = metrics.StageTimer(SEARCH_STAGE_LATENCY)
+    degraded = None
+    
+    # Only cache misses need the encoder, and only they queue for it
+    query_embedding = cached_query_embedding(request.query)
+    if query_embedding is None:
+        try:
+            async with search_admission.slot(raw_request.is_disconnected, timer):
+                query_embedding = await run_in_threadpool(embed_query, request.query, timer)
+        except admission.ClientDisconnected:
+            SEARCH_REQUESTS.inc(endpoint=endpoint, status="disconnected")
+            raise HTTPException(status_code=503, detail="Client disconnected")
+        except admission.Overloaded as e:
+            if SEARCH_DEGRADE != "lexical":
+                SEARCH_REQUESTS.inc(endpoint=endpoint, status="shed")
+                raise HTTPException(status_code=503, detail="Search is overloaded, retry later",
+                                    headers={"Retry-After": str(e.retry_after)})
+            degraded = "lexical"
+        except Exception as e:
+            print(f"Error generating query embedding: {e}")
+    
+    # Do not score for a client that has already gone
+    if await raw_request.is_disconnected():
+        SEARCH_REQUESTS.inc(endpoint=endpoint, status="disconnected")
+        raise HTTPException(status_code=503, detail="Client disconnected")
+    
+    if degraded:
+        with timer.stage("lexical"):
+            results = await run_in_threadpool(
+                fan_out,
+                lambda shard: lexical_search(request.query, top_k, request.department, shard),
+                selected,
+                top_k
+            )
+    elif query_embedding is None:
+        results = []
+    else:
+        results = await run_in_threadpool(
+            search_shards,
+            request.query,
+            top_k,
+            request.department,
+            timer,
+            query_embedding,
+            selected
+        )
+    SEARCH_REQUESTS.inc(endpoint=endpoint, status=degraded or "ok")
+    SEARCH_LATENCY.observe(timer.elapsed())
+    
+    response = {"results": results, "query_time": timer.elapsed(), "degraded": degraded}
+    if timer.trace:
+        response["stages"] = timer.stages
+        print(f"Search trace {endpoint} {request.query[:40]!r}: " +
+              ", ".join(f"{name}={elapsed * 1000:.1f}ms" for name, elapsed in timer.stages.items()))
+    return response
+
 # API endpoints
+# Encoding and scoring run in the threadpool (run_in_threadpool) so they never
+# block the event loop; admission control runs on the loop in front of them.
 @app.post("/search_courses", response_model=CourseSearchResponse)
-async def course_search(request: CourseSearchRequest):
+async def course_search(request: CourseSearchRequest, raw_request: Request):
     """API endpoint for searching courses by query"""
-    results, query_time = search_courses(
-        request.query, 
-        top_k=request.top_k, 
-        department=request.department
-    )
-    return {"results": results, "query_time": query_time}
+    return await run_search(request, raw_request, "/search_courses")
+
+def expanded_view(shard, cluster, visible, start_time):
+    """Graph data for one expanded cluster, linked to the visible node ids"""
+    clusters = shard.clusters
+    expanded = clusters.expand(cluster, visible)
+    if expanded is None:
+        raise HTTPException(status_code=404, detail=f"Unknown cluster {cluster}")
+    nodes, similarities = expanded
+    GRAPH_DATA_LATENCY.observe(time.perf_counter() - start_time)
+    return {
+        "nodes": nodes,
+        "similarities": similarities,
+        "departments": shard.store.departments(),
+        "level": clusters.clusters[cluster].level + 1,
+        "levels": len(clusters.levels),
+        "cluster": cluster,
+        "shard": shard.name
+    }
 
 @app.get("/api/graph-data", response_model=GraphDataResponse)
-async def get_graph_data():
-    """API endpoint to get all course data and similarities for the graph visualization"""
-    # Create a copy of courses without the large embedding arrays to reduce payload size
-    nodes = []
-    for course in courses:
-        # Only include necessary fields for the frontend
-        node = {
-            'id': course['id'],
-            'code': course['code'],
-            'name': course['name'],
-            'department': course['department'],
-            'faculty': course['faculty'],
-            'description': course['description']
-        }
-        nodes.append(node)
+async def get_graph_data(
+    shard: Optional[str] = None,
+    level: Optional[int] = Query(None, ge=0),
+    cluster: Optional[str] = None
+):
+    """
+    API endpoint to get course data and similarities for the graph visualization.
+
+    The graph is that of one shard (the default shard if not given).
+    Without parameters the full course graph is returned. With `level`, the
+    nodes are cluster super-nodes of that hierarchy level with centroid
+    similarities; with `cluster`, the children of that cluster (or its
+    member courses if it is a leaf) are returned.
+    """
+    GRAPH_DATA_REQUESTS.inc()
+    start_time = time.perf_counter()
+    shard = shard_or_404(shard)
+    store, clusters = shard.store, shard.clusters
     
     # Get unique departments
-    departments = extract_departments()
+    departments = store.departments()
     
+    if cluster is not None:
+        return expanded_view(shard, cluster, (), start_time)
+    
+    if level is not None:
+        level, nodes, similarities = clusters.level_view(level)
+        GRAPH_DATA_LATENCY.observe(time.perf_counter() - start_time)
+        return {
+            "nodes": nodes,
+            "similarities": similarities,
+            "departments": departments,
+            "level": level,
+            "levels": len(clusters.levels),
+            "shard": shard.name
+        }
+    
+    # Nodes come from the store without the large embedding arrays
+    nodes = store.nodes()
+    
+    GRAPH_DATA_LATENCY.observe(time.perf_counter() - start_time)
     return {
         "nodes": nodes,
-        "similarities": pairwise_similarities,
-        "departments": departments
+        "similarities": shard.pairwise_similarities,
+        "departments": departments,
+        "version": shard.events.version,
+        "shard": shard.name
+    }
+
+@app.post("/api/graph-data/expand", response_model=GraphDataResponse)
+async def expand_cluster(request: ClusterExpandRequest, shard: Optional[str] = None):
+    """
+    API endpoint to expand one cluster, like GET /api/graph-data?cluster=,
+    plus the new nodes' similarities to the `visible` node ids (other
+    clusters and courses from earlier expansions), so the expansion stays
+    connected to the rest of the graph. The ids go in the body because a
+    long-explored view can show more of them than fit in a URL.
+    """
+    GRAPH_DATA_REQUESTS.inc()
+    start_time = time.perf_counter()
+    return expanded_view(shard_or_404(shard), request.cluster, request.visible, start_time)
+
+@app.get("/api/courses/{course_id}/similar", response_model=SimilarCoursesResponse)
+async def similar_courses(
+    course_id: str,
+    k: int = Query(10, ge=1),
+    department: Optional[List[str]] = Query(None),
+    exclude_department: Optional[List[str]] = Query(None),
+    shard: Optional[str] = None
+):
+    """
+    API endpoint for one course's most similar courses, from precomputed
+    neighbour lists. A k above NEIGHBOUR_K (or a department filter the lists
+    cannot satisfy) is answered by scoring the shard's courses directly.
+    """
+    store = shard_or_404(shard).store
+    row = store.row_of.get(course_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Unknown course {course_id}")
+    
+    def summary(r, score):
+        return {
+            'id': store.ids[r],
+            'code': store.codes[r],
+            'name': store.names[r],
+            'department': store.department(r),
+            'score': score
+        }
+    
+    include = store.department_codes_for(department)
+    if department and not include:
+        # Only unknown departments requested: nothing can match
+        neighbours = []
+    else:
+        neighbours = store.neighbours(
+            row,
+            k,
+            include=include,
+            exclude=store.department_codes_for(exclude_department)
+        )
+    
+    return {
+        "course": summary(row, 1.0),
+        "similar": [summary(r, score) for r, score in neighbours]
     }
 
+# Live course edits. The handlers are async so every change to the store and
+# the similarity map happens on the event loop, between (never during) the
+# graph-data responses that read them; only encoding runs in the threadpool.
+def normalize_sections(sections):
+    """Sections from the API with the fields load_course_data produces"""
+    fields = ('section', 'faculty', 'start_date', 'end_date', 'delivery')
+    return [{field: str(section.get(field, "")) for field in fields} for section in sections] or \
+        [{field: "" for field in fields}]
+
+async def course_embedding(course, store):
+    """The embedding supplied with a course, or one encoded from its text"""
+    if course.embedding is not None:
+        if len(course.embedding) != store.embeddings.shape[1]:
+            raise HTTPException(status_code=422, detail=f"Embedding must have {store.embeddings.shape[1]} dimensions")
+        return course.embedding
+    if not search_enabled() and not EMBEDDING_SERVER_URL:
+        raise HTTPException(status_code=503, detail="No encoder in graph-only mode; send an embedding")
+    try:
+        return await run_in_threadpool(encode_passage, course_text(course.code, course.name, course.description))
+    except Exception as e:
+        print(f"Error generating course embedding: {e}")
+        raise HTTPException(status_code=502, detail="Could not embed the course text")
+
+def update_similarity_row(shard, row, scores):
+    """Overwrite one course's entries in a shard's pairwise similarity map"""
+    store, pairwise_similarities = shard.store, shard.pairwise_similarities
+    shard.lexical_index = None  # Rebuilt with the new text on next use
+    course_id = store.ids[row]
+    for other, similarity in zip(np.flatnonzero(store.alive).tolist(), scores[store.alive].tolist()):
+        if other != row:
+            other_id = store.ids[other]
+            pairwise_similarities[f"{course_id},{other_id}"] = similarity
+            pairwise_similarities[f"{other_id},{course_id}"] = similarity
+    DATASET_PAIRS.set(len(pairwise_similarities), shard=shard.name)
+
+def delta_edges(store, row, scores):
+    """Edges from row to every course at or above DELTA_EDGE_THRESHOLD"""
+    course_id = store.ids[row]
+    others = np.flatnonzero(scores >= DELTA_EDGE_THRESHOLD)
+    return [{"source": course_id, "target": store.ids[other], "similarity": float(scores[other])}
+            for other in others.tolist()]
+
+@app.post("/api/courses", response_model=CourseChangeResponse)
+async def add_course(course: CourseInput, shard: Optional[str] = None):
+    """API endpoint to add a course; connected graphs receive it as a delta event"""
+    shard = shard_or_404(shard)
+    store = shard.store
+    embedding = await course_embedding(course, store)
+    row, scores = store.add(
+        f"course-{uuid.uuid4().hex[:12]}",
+        course.code,
+        course.name,
+        course.department,
+        course.description,
+        normalize_sections(course.sections),
+        embedding
+    )
+    update_similarity_row(shard, row, scores)
+    COURSE_CHANGES.inc(kind="added")
+    DATASET_COURSES.set(store.live_count(), shard=shard.name)
+    
+    node = store.course(row)
+    version = shard.events.publish("delta", {
+        "nodes": [node],
+        "edges": delta_edges(store, row, scores),
+        "removed_nodes": [],
+        "removed_edges": []
+    })
+    return {"course": node, "version": version}
+
+@app.put("/api/courses/{course_id}", response_model=CourseChangeResponse)
+async def update_course(course_id: str, course: CourseInput, shard: Optional[str] = None):
+    """
+    API endpoint to edit a course. The embedding is recomputed only when the
+    text changes (or one is supplied), and only that course's similarity row.
+    """
+    shard = shard_or_404(shard)
+    store = shard.store
+    row = store.row_of.get(course_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Unknown course {course_id}")
+    
+    text_changed = (course.code, course.name, course.description) != \
+        (store.codes[row], store.names[row], store.descriptions[row])
+    embedding = await course_embedding(course, store) if text_changed or course.embedding is not None else None
+    
+    # The course may have been removed while its text was being encoded
+    if store.row_of.get(course_id) != row:
+        raise HTTPException(status_code=404, detail=f"Unknown course {course_id}")
+    
+    old_scores = store.similarity_row(row) if embedding is not None else None
+    scores = store.update(
+        row,
+        course.code,
+        course.name,
+        course.department,
+        course.description,
+        normalize_sections(course.sections),
+        embedding
+    )
+    COURSE_CHANGES.inc(kind="updated")
+    
+    edges, removed_edges = [], []
+    if scores is not None:
+        update_similarity_row(shard, row, scores)
+        edges = delta_edges(store, row, scores)
+        dropped = (old_scores >= DELTA_EDGE_THRESHOLD) & (scores < DELTA_EDGE_THRESHOLD)
+        removed_edges = [{"source": course_id, "target": store.ids[other]}
+                         for other in np.flatnonzero(dropped).tolist()]
+    
+    node = store.course(row)
+    version = shard.events.publish("delta", {
+        "nodes": [node],
+        "edges": edges,
+        "removed_nodes": [],
+        "removed_edges": removed_edges
+    })
+    return {"course": node, "version": version}
+
+@app.delete("/api/courses/{course_id}", response_model=CourseChangeResponse)
+async def remove_course(course_id: str, shard: Optional[str] = None):
+    """API endpoint to remove a course; its node and edges disappear from connected graphs"""
+    shard = shard_or_404(shard)
+    store, pairwise_similarities = shard.store, shard.pairwise_similarities
+    row = store.row_of.get(course_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Unknown course {course_id}")
+    
+    node = store.course(row)
+    store.remove(row)
+    shard.lexical_index = None
+    for other_id in store.ids:
+        pairwise_similarities.pop(f"{course_id},{other_id}", None)
+        pairwise_similarities.pop(f"{other_id},{course_id}", None)
+    COURSE_CHANGES.inc(kind="removed")
+    DATASET_COURSES.set(store.live_count(), shard=shard.name)
+    DATASET_PAIRS.set(len(pairwise_similarities), shard=shard.name)
+    
+    version = shard.events.publish("delta", {
+        "nodes": [],
+        "edges": [],
+        "removed_nodes": [course_id],
+        "removed_edges": []
+    })
+    return {"course": node, "version": version}
+
+@app.get("/api/graph-events")
+async def stream_graph_events(request: Request, since: Optional[int] = None, shard: Optional[str] = None):
+    """
+    Server-Sent Events stream of one shard's graph deltas. Each "delta" event
+    carries nodes and edges to add or update and node/edge ids to remove; a
+    "reset" event means the client missed changes (or the shard was reloaded
+    or unloaded) and should reload /api/graph-data.
+
+    `since` is the graph-data `version` the client loaded; reconnects resume
+    from the Last-Event-ID header instead.
+    """
+    graph_events = shard_or_404(shard).events
+    last_event_id = request.headers.get("last-event-id") or (str(since) if since is not None else None)
+    queue, backlog = graph_events.subscribe(last_event_id)
+    GRAPH_EVENT_CLIENTS.inc()
+    
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            for message in backlog:
+                yield message
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            graph_events.unsubscribe(queue)
+            GRAPH_EVENT_CLIENTS.dec()
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/api/shards", response_model=List[ShardInfo])
+async def list_shards():
+    """API endpoint listing the loaded dataset shards"""
+    default = shards.get()
+    return [dict(shard.summary(), default=shard is default) for shard in shards.select()]
+
+@app.put("/api/shards/{name}", response_model=ShardInfo)
+async def load_shard_endpoint(name: str, request: ShardLoadRequest):
+    """
+    API endpoint to load (or reload) a shard from an embeddings CSV under
+    SHARD_DATA_DIR. Other shards keep serving while it loads.
+    """
+    if not SHARD_NAME.match(name):
+        raise HTTPException(status_code=422, detail="Shard names may only use letters, digits, '.', '_' and '-'")
+    data_dir = os.path.realpath(SHARD_DATA_DIR)
+    csv_file = os.path.realpath(os.path.join(data_dir, request.path))
+    if os.path.commonpath([data_dir, csv_file]) != data_dir or not os.path.isfile(csv_file):
+        raise HTTPException(status_code=404, detail=f"No CSV {request.path} in the shard data directory")
+    
+    shard = await run_in_threadpool(load_shard, name, csv_file)
+    if shard is None:
+        raise HTTPException(status_code=422, detail=f"No courses with embeddings in {request.path}")
+    register_shard(shard)
+    return dict(shard.summary(), default=shard is shards.get())
+
+@app.delete("/api/shards/{name}", response_model=ShardInfo)
+async def unload_shard(name: str):
+    """API endpoint to unload a shard; its graph-event clients are told to reload"""
+    shard = shards.remove(name)
+    if shard is None:
+        raise HTTPException(status_code=404, detail=f"Unknown shard {name}")
+    shard.events.publish("reset", {"shard": name})
+    DATASET_COURSES.remove(shard=name)
+    DATASET_PAIRS.remove(shard=name)
+    return shard.summary()
+
 # Add a proxy endpoint for search that passes the query to the embedding server
 @app.post("/api/search", response_model=CourseSearchResponse)
-async def search_proxy(request: CourseSearchRequest):
+async def search_proxy(request: CourseSearchRequest, raw_request: Request):
     """API endpoint for searching courses that embeds queries on-the-fly"""
-    results, query_time = search_courses(
-        request.query, 
-        top_k=request.top_k, 
-        department=request.department
-    )
-    return {"results": results, "query_time": query_time}
+    return await run_search(request, raw_request, "/api/search")
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics: request counts, cache hits, batch sizes, dataset size and latency histograms"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
 
 # Data initialization
-def initialize():
-    """Initialize the application by loading data and pre-calculating similarities"""
-    global courses
-    
-    # Load course data
+def find_default_csv():
+    """Location of the single default embeddings CSV, or None"""
     csv_file = '../data/course-embd-data-with-embeddings.csv'
     if not os.path.exists(csv_file):
         print(f"Warning: {csv_file} not found, looking in alternate locations")
@@ -315,29 +1063,113 @@ def initialize():
                 print(f"Found CSV at {csv_file}")
                 break
     
-    if not os.path.exists(csv_file):
-        print("Error: Could not find course data CSV file")
-        return False
+    return csv_file if os.path.exists(csv_file) else None
+
+def parse_shard_config(config):
+    """Parse "name=path,name=path" into (name, path) pairs"""
+    pairs = []
+    for entry in config.split(","):
+        if not entry.strip():
+            continue
+        name, _, path = entry.partition("=")
+        if not path or not SHARD_NAME.match(name.strip()):
+            raise ValueError(f"Invalid shard entry {entry!r}; expected name=path")
+        pairs.append((name.strip(), path.strip()))
+    return pairs
+
+def initialize(shard_config=COURSE_SHARDS):
+    """Initialize the application by loading every configured shard and pre-calculating similarities"""
+    configured = parse_shard_config(shard_config)
+    if not configured:
+        csv_file = find_default_csv()
+        if csv_file is None:
+            print("Error: Could not find course data CSV file")
+            return False
+        configured = [("default", csv_file)]
     
-    # Load courses
-    courses = load_course_data(csv_file)
+    for name, csv_file in configured:
+        if not os.path.exists(csv_file):
+            print(f"Warning: CSV for shard {name} not found at {csv_file}")
+            continue
+        shard = load_shard(name, csv_file)
+        if shard is None:
+            print(f"Warning: No course data loaded for shard {name}!")
+            continue
+        register_shard(shard)
+        print(f"Loaded shard {name}: {len(shard.store)} courses")
     
-    if not courses:
+    if not len(shards):
         print("Warning: No course data loaded!")
         return False
     
-    # Calculate pairwise similarities
-    calculate_pairwise_similarities()
-    
-    print(f"Successfully loaded {len(courses)} courses and calculated similarities")
-    return len(courses) > 0
+    print(f"Successfully loaded {len(shards)} shard(s) and calculated similarities")
+    return True
+
+# Modules each serving mode imports before it can answer its first request
+MODE_IMPORTS = {
+    "graph-only": [],
+    "full-remote": ["requests"],  # full mode with EMBEDDING_SERVER_URL set
+    "full-local": ["torch", "sentence_transformers"],
+}
+
+IMPORT_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import main
+base_time = time.perf_counter() - start
+base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print(json.dumps({
+    "import_main_s": base_time,
+    "mode_imports_s": time.perf_counter() - start,
+    "base_rss_mb": base_rss / 1024,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+def import_report():
+    """Measure cold import time and memory for each serving mode in a fresh interpreter"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'mode':<12} {'import main':>12} {'mode imports':>13} {'base RSS':>10} {'peak RSS':>10}")
+    for mode, modules in MODE_IMPORTS.items():
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE, *modules],
+            cwd=here, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+            print(f"{mode:<12} {error}")
+            continue
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{mode:<12} {stats['import_main_s']:>11.3f}s {stats['mode_imports_s']:>12.3f}s "
+              f"{stats['base_rss_mb']:>8.1f}MB {stats['peak_rss_mb']:>8.1f}MB")
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Course Graph API server")
+    parser.add_argument("--mode", choices=["full", "graph-only"], default=SERVING_MODE,
+                        help="Serving mode (default: $SERVING_MODE or full)")
+    parser.add_argument("--import-report", action="store_true",
+                        help="Print cold-start import time and RSS for each mode and exit")
+    parser.add_argument("--shard", action="append", default=[], metavar="NAME=PATH",
+                        help="Load a dataset shard (repeatable; default: $COURSE_SHARDS or the single default CSV)")
+    args = parser.parse_args()
+    
+    if args.import_report:
+        import_report()
+        sys.exit(0)
+    
+    SERVING_MODE = args.mode
+    
     import uvicorn
     
     # Initialize on startup
-    if initialize():
-        print(f"Server initialized with {len(courses)} courses")
+    if initialize(",".join(args.shard) or COURSE_SHARDS):
+        total = sum(len(shard.store) for shard in shards.select())
+        print(f"Server initialized with {total} courses in {len(shards)} shard(s) ({SERVING_MODE} mode)")
         uvicorn.run(app, host="0.0.0.0", port=8001)
     else:
-        print("Failed to initialize the server. Check if the course data CSV exists.") 
\ No newline at end of file
+        print("Failed to initialize the server. Check if the course data CSV exists.")
@@ -0,0 +1,84 @@
+"""
+Named dataset shards, e.g. one per academic term or campus.
+
+Each shard has its own CourseStore (embedding matrix), similarity map,
+cluster hierarchy, keyword index and live-update stream, so shards can be
+loaded, reloaded and unloaded independently. ShardSet swaps in a new dict
+on every change, so a search that is already running keeps the shards it
+started with.
+"""
+import re
+import time
+
+from graph_events import GraphEvents
+
+SHARD_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class Shard:
+    """One named dataset and everything derived from it"""
+
+    def __init__(self, name, source, store, pairwise_similarities=None, clusters=None):
+        self.name = name
+        self.source = source  # CSV the shard was loaded from
+        self.store = store
+        self.pairwise_similarities = pairwise_similarities if pairwise_similarities is not None else {}
+        self.clusters = clusters
+        self.lexical_index = None  # Built on first degraded search
+        self.events = GraphEvents()
+        self.loaded_at = time.time()
+
+    def summary(self):
+        return {
+            'name': self.name,
+            'source': self.source,
+            'courses': self.store.live_count(),
+            'departments': len(self.store.departments()),
+            'loaded_at': self.loaded_at,
+        }
+
+
+class ShardSet:
+    """The loaded shards by name, plus which one requests without a shard use"""
+
+    def __init__(self, default_name=None):
+        self._shards = {}
+        self.default_name = default_name
+
+    def __len__(self):
+        return len(self._shards)
+
+    def __contains__(self, name):
+        return name in self._shards
+
+    def names(self):
+        return list(self._shards)
+
+    def get(self, name=None):
+        """A shard by name, the default shard if name is None, or None"""
+        shards = self._shards
+        if name is None:
+            name = self.default_name if self.default_name in shards else next(iter(shards), None)
+        return shards.get(name)
+
+    def select(self, names=None):
+        """Shards by name, all of them if names is empty; raises KeyError for unknown names"""
+        shards = self._shards
+        if not names:
+            return list(shards.values())
+        return [shards[name] for name in dict.fromkeys(names)]
+
+    def add(self, shard):
+        """Add or replace a shard; returns the shard it replaced, if any"""
+        shards = dict(self._shards)
+        previous = shards.get(shard.name)
+        shards[shard.name] = shard
+        self._shards = shards
+        return previous
+
+    def remove(self, name):
+        """Remove a shard; returns it, or None if it was not loaded"""
+        shards = dict(self._shards)
+        removed = shards.pop(name, None)
+        self._shards = shards
+        return removed
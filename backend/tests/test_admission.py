@@ -0,0 +1,181 @@
+"""
+Tests for admission control: shedding, slot hand-over and abandoned waiters.
+"""
+import asyncio
+import itertools
+import time
+import unittest
+from unittest import mock
+
+import admission
+import metrics
+
+_prefixes = itertools.count()
+
+
+def controller(**kwargs):
+    """A controller with its own metrics, so shed counts do not leak between tests"""
+    return admission.AdmissionController(f"test_admission_{next(_prefixes)}", **kwargs)
+
+
+def deadline(seconds=5.0):
+    return time.monotonic() + seconds
+
+
+class TestAdmission(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AdmissionController."""
+
+    async def wait_queued(self, ctrl, depth):
+        """Let waiter tasks run until depth of them are queued"""
+        for _ in range(100):
+            if ctrl.queue_depth() == depth:
+                return
+            await asyncio.sleep(0)
+        self.fail(f"expected {depth} waiters, found {ctrl.queue_depth()}")
+
+    async def test_free_slot_is_immediate(self):
+        ctrl = controller(max_concurrency=2)
+        await ctrl.acquire(deadline())
+        await ctrl.acquire(deadline())
+        self.assertEqual(ctrl.active, 2)
+        self.assertEqual(ctrl.queue_depth(), 0)
+        ctrl.release()
+        ctrl.release()
+        self.assertEqual(ctrl.active, 0)
+
+    async def test_queue_full_is_shed(self):
+        ctrl = controller(max_concurrency=1, max_queue=1, retry_after=1)
+        await ctrl.acquire(deadline())
+        waiter = asyncio.create_task(ctrl.acquire(deadline()))
+        await self.wait_queued(ctrl, 1)
+
+        ctrl.service_time = 3.0
+        with self.assertRaises(admission.Overloaded) as raised:
+            await ctrl.acquire(deadline())
+        self.assertEqual(raised.exception.reason, "queue_full")
+        # One waiter ahead plus this request, at 3s each through one slot
+        self.assertEqual(raised.exception.retry_after, 6)
+        self.assertEqual(ctrl.shed_counter.value(reason="queue_full"), 1)
+
+        ctrl.release()
+        await waiter
+        self.assertEqual(ctrl.active, 1)
+        ctrl.release()
+        self.assertEqual(ctrl.active, 0)
+
+    async def test_deadline_is_shed(self):
+        ctrl = controller(max_concurrency=1, retry_after=2)
+        await ctrl.acquire(deadline())
+        with self.assertRaises(admission.Overloaded) as raised:
+            await ctrl.acquire(deadline(0.05))
+        self.assertEqual(raised.exception.reason, "deadline")
+        self.assertEqual(raised.exception.retry_after, 2)
+        self.assertEqual(ctrl.shed_counter.value(reason="deadline"), 1)
+        self.assertEqual(ctrl.queue_depth(), 0)
+        self.assertEqual(ctrl.queue_gauge.value(), 0)
+        self.assertEqual(ctrl.active, 1)
+
+    async def test_waiters_are_served_in_order(self):
+        ctrl = controller(max_concurrency=1)
+        await ctrl.acquire(deadline())
+        served = []
+
+        async def wait(name):
+            await ctrl.acquire(deadline())
+            served.append(name)
+
+        tasks = [asyncio.create_task(wait(name)) for name in ("first", "second")]
+        await self.wait_queued(ctrl, 2)
+        ctrl.release()
+        await tasks[0]
+        self.assertEqual(served, ["first"])
+        self.assertEqual(ctrl.active, 1)  # Handed over, never freed
+        ctrl.release()
+        await tasks[1]
+        self.assertEqual(served, ["first", "second"])
+        ctrl.release()
+        self.assertEqual(ctrl.active, 0)
+
+    async def quitter(self, ctrl, queue_behind=0):
+        """
+        Queue a waiter that is handed a slot while it is checking its client
+        and then finds the client gone, with queue_behind more waiters after
+        it. Returns the tasks of those waiters once the quitter has given up.
+        """
+        checking = asyncio.Event()
+        answer = asyncio.Event()
+
+        async def is_disconnected():
+            checking.set()
+            await answer.wait()
+            return True
+
+        with mock.patch.object(admission, "DISCONNECT_POLL_SECONDS", 0.01):
+            quitter = asyncio.create_task(ctrl.acquire(deadline(), is_disconnected))
+            await checking.wait()
+            behind = [asyncio.create_task(ctrl.acquire(deadline())) for _ in range(queue_behind)]
+            await self.wait_queued(ctrl, 1 + queue_behind)
+            ctrl.release()  # The slot goes to the quitter, first in line...
+            answer.set()  # ...which gives up anyway
+            with self.assertRaises(admission.ClientDisconnected):
+                await quitter
+        return behind
+
+    async def test_slot_handed_to_waiter_that_gives_up(self):
+        """A slot handed to a waiter as it gives up goes on to the next waiter."""
+        ctrl = controller(max_concurrency=1)
+        await ctrl.acquire(deadline())
+        patient, = await self.quitter(ctrl, queue_behind=1)
+        await patient
+        self.assertEqual(ctrl.active, 1)
+        self.assertEqual(ctrl.queue_depth(), 0)
+        ctrl.release()
+        self.assertEqual(ctrl.active, 0)
+
+    async def test_slot_handed_to_last_waiter_that_gives_up(self):
+        """With nobody else waiting, the abandoned slot is freed."""
+        ctrl = controller(max_concurrency=1)
+        await ctrl.acquire(deadline())
+        await self.quitter(ctrl)
+        self.assertEqual(ctrl.active, 0)
+        self.assertEqual(ctrl.queue_depth(), 0)
+        await ctrl.acquire(deadline(0.05))  # Free again without waiting
+        ctrl.release()
+
+    async def test_disconnected_waiter_is_dropped(self):
+        ctrl = controller(max_concurrency=1)
+        await ctrl.acquire(deadline())
+        connected = True
+
+        async def is_disconnected():
+            return not connected
+
+        with mock.patch.object(admission, "DISCONNECT_POLL_SECONDS", 0.01):
+            waiter = asyncio.create_task(ctrl.acquire(deadline(), is_disconnected))
+            await self.wait_queued(ctrl, 1)
+            await asyncio.sleep(0.03)
+            self.assertFalse(waiter.done())  # Still connected: keeps waiting
+            connected = False
+            with self.assertRaises(admission.ClientDisconnected):
+                await waiter
+        self.assertEqual(ctrl.shed_counter.value(reason="disconnected"), 1)
+        self.assertEqual(ctrl.queue_depth(), 0)
+        ctrl.release()
+        self.assertEqual(ctrl.active, 0)
+
+    async def test_slot_context(self):
+        """slot() records queue_wait once and releases even when the block fails."""
+        ctrl = controller(max_concurrency=1)
+        timer = metrics.StageTimer(None)
+        timer.trace = True
+        with self.assertRaises(RuntimeError):
+            async with ctrl.slot(timer=timer):
+                self.assertEqual(ctrl.active, 1)
+                raise RuntimeError("encoder failed")
+        self.assertEqual(ctrl.active, 0)
+        self.assertEqual(list(timer.stages), ["queue_wait"])
+        self.assertIsNotNone(ctrl.service_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
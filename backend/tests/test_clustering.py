@@ -0,0 +1,116 @@
+"""
+Tests for cluster expansion in the level-of-detail graph.
+"""
+import unittest
+from unittest import mock
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main
+from clustering import ClusterHierarchy
+from shards import Shard, ShardSet
+from tests.test_course_store import make_store
+
+
+class TestClusterExpansion(unittest.TestCase):
+    """Test cases for ClusterHierarchy.expand."""
+
+    def setUp(self):
+        self.store = make_store(np.random.default_rng(3), num_courses=120)
+        self.hierarchy = ClusterHierarchy(self.store, leaf_size=10, branching=4)
+
+    def vector(self, node_id):
+        cluster = self.hierarchy.clusters.get(node_id)
+        if cluster is not None:
+            return cluster.centroid
+        return self.store.embeddings[self.store.row_of[node_id]]
+
+    def check_links(self, nodes, similarities, visible):
+        for node in nodes:
+            for other in visible:
+                expected = float(self.vector(node['id']) @ self.vector(other))
+                self.assertAlmostEqual(similarities[f"{node['id']},{other}"], expected, places=5)
+                self.assertAlmostEqual(similarities[f"{other},{node['id']}"], expected, places=5)
+
+    def test_without_visible_nodes(self):
+        """Only pairs among the new nodes, as before."""
+        top = self.hierarchy.levels[0]
+        nodes, similarities = self.hierarchy.expand(top[0].id)
+        ids = {node['id'] for node in nodes}
+        self.assertTrue(all(set(key.split(',')) <= ids for key in similarities))
+
+    def test_children_link_to_visible_clusters(self):
+        top = self.hierarchy.levels[0]
+        parent = next(cluster for cluster in top if cluster.children)
+        siblings = [cluster.id for cluster in top if cluster is not parent]
+        nodes, similarities = self.hierarchy.expand(parent.id, siblings + [parent.id, "no-such-node"])
+        self.assertEqual([node['id'] for node in nodes], [child.id for child in parent.children])
+        self.check_links(nodes, similarities, siblings)
+        self.assertFalse(any(parent.id in key.split(',') for key in similarities))
+        self.assertFalse(any("no-such-node" in key.split(',') for key in similarities))
+
+    def test_summary_leaves_out_removed_courses(self):
+        """A super-node's size and courses match what expanding it shows."""
+        leaf = next(cluster for cluster in self.hierarchy.clusters.values() if not cluster.children)
+        central = self.hierarchy.summary(leaf)['top_courses'][0]
+        removed = next(row for row in leaf.members.tolist() if self.store.names[row] == central)
+        self.store.remove(removed)
+        summary = self.hierarchy.summary(leaf)
+        nodes, _ = self.hierarchy.expand(leaf.id)
+        self.assertEqual(summary['size'], len(nodes))
+        self.assertNotIn(central, summary['top_courses'])
+
+        for row in leaf.members.tolist():
+            if self.store.alive[row]:
+                self.store.remove(row)
+        summary = self.hierarchy.summary(leaf)
+        self.assertEqual((summary['size'], summary['top_courses'], summary['label']), (0, [], 'Other'))
+
+    def test_members_link_to_visible_clusters_and_courses(self):
+        leaves = [cluster for cluster in self.hierarchy.clusters.values() if not cluster.children]
+        leaf, other = leaves[0], leaves[1]
+        self.store.remove(int(other.members[0]))  # Removed courses are no longer linked
+        shown = [self.store.ids[row] for row in other.members.tolist()]
+        visible = [cluster.id for cluster in self.hierarchy.levels[0] if cluster.id != leaf.id] + shown
+        nodes, similarities = self.hierarchy.expand(leaf.id, visible)
+        self.assertTrue(all(node['type'] == 'course' for node in nodes))
+        live = [node_id for node_id in visible if node_id != shown[0]]
+        self.check_links(nodes, similarities, live)
+        self.assertFalse(any(shown[0] in key.split(',') for key in similarities))
+
+
+class TestExpandEndpoint(unittest.TestCase):
+    """POST /api/graph-data/expand takes the visible ids in its body."""
+
+    def setUp(self):
+        store = make_store(np.random.default_rng(5), num_courses=300)
+        self.hierarchy = ClusterHierarchy(store, leaf_size=10, branching=4)
+        shard_set = ShardSet()
+        shard_set.add(Shard("test", "memory", store, {}, self.hierarchy))
+        patch = mock.patch.object(main, "shards", shard_set)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.client = TestClient(main.app)
+
+    def test_many_visible_ids(self):
+        top = self.hierarchy.levels[0]
+        siblings = [cluster.id for cluster in top[1:]]
+        # Far more ids than fit in a URL; unknown ones are ignored
+        visible = siblings + [f"unknown-course-{i}" for i in range(5000)]
+        response = self.client.post("/api/graph-data/expand", json={"cluster": top[0].id, "visible": visible})
+        self.assertEqual(response.status_code, 200, response.text)
+        data = response.json()
+        self.assertEqual(data["cluster"], top[0].id)
+        new_ids = [node["id"] for node in data["nodes"]]
+        for node_id in new_ids:
+            for sibling in siblings:
+                self.assertIn(f"{node_id},{sibling}", data["similarities"])
+
+    def test_unknown_cluster(self):
+        response = self.client.post("/api/graph-data/expand", json={"cluster": "no-such-cluster"})
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
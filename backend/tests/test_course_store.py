@@ -0,0 +1,134 @@
+"""
+Tests for the columnar course store: live edits must leave neighbour lists
+and department lookups exactly as a from-scratch computation would.
+"""
+import unittest
+
+import numpy as np
+
+from course_store import CourseStoreBuilder
+
+DEPARTMENTS = ["Dance", "Literature", "Music", "Visual Arts", ""]
+DIM = 8
+K = 5
+
+
+def section(faculty):
+    return {'section': '1', 'faculty': faculty, 'start_date': '', 'end_date': '', 'delivery': ''}
+
+
+def make_store(rng, num_courses=40):
+    builder = CourseStoreBuilder()
+    for i in range(num_courses):
+        builder.add(f"c{i}", f"C {i}", f"Course {i}", DEPARTMENTS[i % len(DEPARTMENTS)], "",
+                    section(f"Faculty {i % 7}"), rng.standard_normal(DIM))
+    store = builder.build()
+    store.build_neighbours(K)
+    return store
+
+
+class TestCourseStore(unittest.TestCase):
+    """Random add/update/remove sequences checked against brute force."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.store = make_store(self.rng)
+        self.next_id = len(self.store)
+
+    def live_rows(self):
+        return np.flatnonzero(self.store.alive)
+
+    def brute_neighbours(self, row, k, include=None):
+        """The k live rows most similar to row, best first"""
+        store = self.store
+        scores = store.embeddings @ store.embeddings[row]
+        candidates = [other for other in self.live_rows().tolist() if other != row
+                      and (include is None or store.department_codes[other] in include)]
+        candidates.sort(key=lambda other: -scores[other])
+        return [(other, float(scores[other])) for other in candidates[:k]]
+
+    def brute_department(self, department):
+        return [row for row in self.live_rows().tolist()
+                if not department or self.store.department(row).lower() == department.lower()]
+
+    def random_edit(self):
+        store = self.store
+        live = self.live_rows()
+        kind = self.rng.choice(["add", "update", "update_text", "remove"]) if len(live) > K + 2 else "add"
+        department = DEPARTMENTS[self.rng.integers(len(DEPARTMENTS))]
+        if self.rng.random() < 0.1:
+            department = f"New {self.rng.integers(3)}"
+        if kind == "add":
+            store.add(f"c{self.next_id}", f"C {self.next_id}", f"Course {self.next_id}", department, "",
+                      [section("Someone")], self.rng.standard_normal(DIM))
+            self.next_id += 1
+        elif kind == "remove":
+            store.remove(int(self.rng.choice(live)))
+        else:
+            row = int(self.rng.choice(live))
+            embedding = self.rng.standard_normal(DIM) if kind == "update" else None
+            store.update(row, store.codes[row], store.names[row], department, "", [section("Someone")], embedding)
+
+    def assert_consistent(self):
+        store = self.store
+        for row in self.live_rows().tolist():
+            expected = self.brute_neighbours(row, K)
+            listed = [(int(other), float(score)) for other, score
+                      in zip(store.neighbour_rows[row], store.neighbour_scores[row])]
+            self.assertEqual([other for other, _ in listed], [other for other, _ in expected], f"row {row}")
+            for (_, score), (_, want) in zip(listed, expected):
+                self.assertAlmostEqual(score, want, places=5)
+
+            # Served from the lists, from brute force past them, and with a department filter
+            for k, include in ((3, None), (K + 10, None), (K, [store.department_codes[row]])):
+                got = store.neighbours(row, k, include=include)
+                want = self.brute_neighbours(row, k, include)
+                self.assertEqual([other for other, _ in got], [other for other, _ in want],
+                                 f"row {row}, k={k}, include={include}")
+
+        # A falsy department means every department
+        for department in [None] + store.department_names + ["dance", "Missing"]:
+            rows = np.arange(len(store))[store.rows_for_department(department)].tolist()
+            self.assertEqual(sorted(rows), self.brute_department(department), f"department {department!r}")
+        live_departments = {store.department(row) for row in self.live_rows().tolist()}
+        self.assertEqual(store.departments(), sorted(name for name in live_departments if name))
+        self.assertEqual(store.live_count(), len(self.live_rows()))
+        self.assertEqual(sorted(store.row_of.values()), self.live_rows().tolist())
+
+    def test_loaded_store(self):
+        self.assert_consistent()
+
+    def test_random_edits(self):
+        for step in range(150):
+            self.random_edit()
+            if step % 10 == 9:
+                self.assert_consistent()
+        self.assert_consistent()
+
+    def test_emptied_departments_are_dropped(self):
+        """A department whose last course is removed or moved away is no longer listed."""
+        store = self.store
+        row, _ = store.add("zed", "Z 1", "Zed", "Zed", "", [section("")], self.rng.standard_normal(DIM))
+        self.assertIn("Zed", store.departments())
+        store.remove(row)
+        self.assertNotIn("Zed", store.departments())
+
+        row, _ = store.add("yew", "Y 1", "Yew", "Yew", "", [section("")], self.rng.standard_normal(DIM))
+        store.update(row, "Y 1", "Yew", "Music", "", [section("")])
+        self.assertNotIn("Yew", store.departments())
+        self.assert_consistent()
+
+    def test_add_grows_buffers(self):
+        """Appends past the initial allocation keep every column the same length."""
+        for _ in range(100):
+            self.store.add(f"c{self.next_id}", "", "", "Music", "", [section("")], self.rng.standard_normal(DIM))
+            self.next_id += 1
+        store = self.store
+        for column in (store.embeddings, store.department_codes, store.alive,
+                       store.neighbour_rows, store.neighbour_scores):
+            self.assertEqual(len(column), len(store))
+        self.assert_consistent()
+
+
+if __name__ == "__main__":
+    unittest.main()
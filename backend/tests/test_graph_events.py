@@ -0,0 +1,75 @@
+"""
+Tests for the SSE fan-out: catch-up backlogs and when a client is told to reset.
+"""
+import json
+import unittest
+
+from graph_events import GraphEvents
+
+
+def parse(message):
+    """(id, event, data) of one SSE message"""
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+
+class TestGraphEvents(unittest.IsolatedAsyncioTestCase):
+    """Test cases for GraphEvents."""
+
+    async def asyncSetUp(self):
+        self.events = GraphEvents(history=4, queue_size=3)
+
+    def publish(self, count):
+        for i in range(count):
+            self.events.publish("course_updated", {"course": {"id": f"c{i}"}})
+
+    async def test_new_stream_has_no_backlog(self):
+        self.publish(2)
+        queue, backlog = self.events.subscribe()
+        self.assertEqual(backlog, [])
+        self.publish(1)
+        self.assertEqual(parse(queue.get_nowait())[:2], (3, "course_updated"))
+
+    async def test_backlog_since_last_event(self):
+        self.publish(3)
+        _, backlog = self.events.subscribe("1")
+        self.assertEqual([parse(message)[0] for message in backlog], [2, 3])
+        self.assertEqual(parse(backlog[0])[2]["version"], 2)
+
+    async def test_up_to_date_stream(self):
+        self.publish(3)
+        self.assertEqual(self.events.subscribe("3")[1], [])
+        # A fresh shard with no events yet and a client that has seen none
+        self.assertEqual(GraphEvents().subscribe("0")[1], [])
+
+    async def test_reset_when_history_is_gone(self):
+        self.publish(6)  # History keeps versions 3-6
+        _, backlog = self.events.subscribe("1")
+        self.assertEqual(len(backlog), 1)
+        self.assertEqual(parse(backlog[0]), (6, "reset", {"version": 6}))
+        # The oldest version still in the history is enough to catch up
+        self.assertEqual([parse(message)[0] for message in self.events.subscribe("2")[1]], [3, 4, 5, 6])
+
+    async def test_reset_when_ahead_of_the_stream(self):
+        """A client that saw a replaced shard's later events must reload."""
+        self.publish(2)
+        _, backlog = self.events.subscribe("9")
+        self.assertEqual([parse(message)[1] for message in backlog], ["reset"])
+        _, backlog = self.events.subscribe("not-a-number")
+        self.assertEqual([parse(message)[1] for message in backlog], ["reset"])
+
+    async def test_slow_subscriber_is_reset(self):
+        queue, _ = self.events.subscribe()
+        self.publish(4)  # One more than the queue holds
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(parse(queue.get_nowait()), (4, "reset", {"version": 4}))
+
+    async def test_unsubscribe(self):
+        queue, _ = self.events.subscribe()
+        self.events.unsubscribe(queue)
+        self.publish(1)
+        self.assertTrue(queue.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for the search endpoints' handling of top_k.
+"""
+import unittest
+from unittest import mock
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main
+from shards import Shard, ShardSet
+from tests.test_course_store import DIM, make_store
+
+
+class TestSearchTopK(unittest.TestCase):
+    """top_k may be null (every match) and is never negative."""
+
+    def setUp(self):
+        self.store = make_store(np.random.default_rng(11), num_courses=30)
+        shard_set = ShardSet()
+        shard_set.add(Shard("test", "memory", self.store, {}, None))
+        query = np.random.default_rng(12).standard_normal(DIM).tolist()
+        patches = [
+            mock.patch.object(main, "shards", shard_set),
+            mock.patch.object(main, "embed_query", lambda query_text, timer: query),
+            mock.patch.object(main, "QUERY_CACHE_SIZE", 0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = TestClient(main.app)
+
+    def search(self, top_k, **extra):
+        response = self.client.post("/api/search", json={"query": "course", "top_k": top_k, **extra})
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()["results"]
+
+    def test_default_and_explicit(self):
+        results = self.client.post("/api/search", json={"query": "course"}).json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len(self.search(3)), 3)
+
+    def test_null_returns_every_course(self):
+        results = self.search(None)
+        self.assertEqual(len(results), len(self.store))
+        scores = [result["score"] for result in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(self.search(None, department="Dance")), 6)
+
+    def test_negative_returns_nothing(self):
+        self.assertEqual(self.search(-3), [])
+        self.assertEqual(self.search(0), [])
+
+    def test_lexical(self):
+        """The keyword fallback takes the same resolved limits."""
+        shard = main.shards.get()
+        self.assertEqual(len(main.lexical_search("course", main.result_limit(None, [shard]), shard=shard)),
+                         len(self.store))
+        self.assertEqual(main.lexical_search("course", main.result_limit(-1, [shard]), shard=shard), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
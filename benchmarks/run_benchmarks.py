@@ -0,0 +1,259 @@
+"""
+Reproducible backend benchmarks on synthetic catalogs.
+
+Each catalog size runs in a fresh interpreter against backend/main.py, with
+the deterministic stub encoder in place of NV-Embed-v2, and measures:
+
+- load_course_data time
+- similarity/graph build time (up to --max-graph-size courses)
+- search latency p50/p99 and throughput under concurrency
+- /api/graph-data payload size and response time
+- peak RSS
+
+Results are written as JSON (default: results/<commit>.json) and can be
+compared against an earlier run:
+
+    python run_benchmarks.py --sizes 1000,10000 --compare results/abc1234.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(os.path.dirname(HERE), "backend")
+CACHE_DIR = os.path.join(HERE, ".cache")
+RESULTS_DIR = os.path.join(HERE, "results")
+
+# Metrics shown in the summary and comparison tables: (label, path in result)
+REPORTED = [
+    ("courses", ("courses",)),
+    ("load s", ("load_s",)),
+    ("graph build s", ("graph_build_s",)),
+    ("graph-data s", ("graph_data", "seconds")),
+    ("graph-data MB", ("graph_data", "megabytes")),
+    ("search p50 ms", ("search", "p50_ms")),
+    ("search p99 ms", ("search", "p99_ms")),
+    ("search qps", ("search", "qps")),
+    ("peak RSS MB", ("peak_rss_mb",)),
+]
+
+
+def lookup(result, path):
+    value = result
+    for key in path:
+        if not isinstance(value, dict) or value.get(key) is None:
+            return None
+        value = value[key]
+    return value
+
+
+def run_size(args):
+    """Benchmark one catalog size in this process and return the result dict"""
+    sys.path.insert(0, BACKEND_DIR)
+    from synthetic_catalog import cached_catalog, make_encoder, make_queries
+
+    # Generated beforehand by a --prepare process, so generation is not measured here
+    catalog = cached_catalog(CACHE_DIR, args.size, args.dim, args.seed)
+    queries = make_queries(args.requests, seed=args.seed)
+
+    # The backend prints progress; keep it out of the JSON on stdout
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        import main
+
+    main.model = make_encoder(args.dim)
+    main.QUERY_CACHE_SIZE = 0  # Every query pays for encoding and scoring
+
+    result = {"size": args.size}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        store = main.load_course_data(catalog)
+        result["load_s"] = time.perf_counter() - start
+    result["courses"] = len(store)
+    shard = main.Shard("bench", catalog, store)
+    main.register_shard(shard)
+
+    if len(store) <= args.max_graph_size:
+        from fastapi.testclient import TestClient
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            shard.pairwise_similarities = main.calculate_pairwise_similarities(store)
+            result["graph_build_s"] = time.perf_counter() - start
+
+        client = TestClient(main.app)
+        start = time.perf_counter()
+        response = client.get("/api/graph-data")
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        result["graph_data"] = {
+            "seconds": elapsed,
+            "megabytes": len(response.content) / (1024 * 1024),
+        }
+    else:
+        result["graph_build_s"] = None
+        result["graph_data"] = None
+
+    def timed_search(query):
+        start = time.perf_counter()
+        main.search_courses(query, top_k=10)
+        return time.perf_counter() - start
+
+    # Warm up once so one-time costs do not land in the percentiles
+    with contextlib.redirect_stdout(io.StringIO()):
+        timed_search(queries[0])
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            start = time.perf_counter()
+            latencies = np.array(list(pool.map(timed_search, queries)))
+            wall = time.perf_counter() - start
+
+    result["search"] = {
+        "concurrency": args.concurrency,
+        "requests": len(queries),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "mean_ms": float(latencies.mean() * 1000),
+        "qps": len(queries) / wall,
+    }
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def git_commit():
+    """Short commit hash of the tree being measured, with '-dirty' if modified"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "../backend"], cwd=HERE,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def format_value(value):
+    if value is None:
+        return "-"
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.3f}" if abs(value) < 100 else f"{value:.0f}"
+
+
+def print_table(results):
+    print(f"{'size':>8} " + " ".join(f"{label:>14}" for label, _ in REPORTED))
+    for result in results:
+        if "error" in result:
+            print(f"{result['size']:>8} error: {result['error']}")
+            continue
+        print(f"{result['size']:>8} " + " ".join(
+            f"{format_value(lookup(result, path)):>14}" for _, path in REPORTED))
+
+
+def print_comparison(current, baseline):
+    """Print new/old ratios for every size present in both runs"""
+    old_by_size = {r["size"]: r for r in baseline["results"] if "error" not in r}
+    print(f"\nCompared with {baseline.get('commit', '?')} (ratio new/old, <1 is better except qps):")
+    print(f"{'size':>8} " + " ".join(f"{label:>14}" for label, _ in REPORTED[1:]))
+    for result in current["results"]:
+        old = old_by_size.get(result["size"])
+        if old is None or "error" in result:
+            continue
+        cells = []
+        for _, path in REPORTED[1:]:
+            new_value, old_value = lookup(result, path), lookup(old, path)
+            cells.append(f"{new_value / old_value:>13.2f}x" if new_value is not None and old_value else f"{'-':>14}")
+        print(f"{result['size']:>8} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the course backend on synthetic catalogs")
+    parser.add_argument("--sizes", default="1000,5000,20000",
+                        help="Comma-separated catalog sizes, e.g. 1000,10000,200000")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension of the stub encoder")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent search clients")
+    parser.add_argument("--requests", type=int, default=200, help="Search requests per size")
+    parser.add_argument("--max-graph-size", type=int, default=2000,
+                        help="Skip the O(n^2) similarity build above this many courses")
+    parser.add_argument("--output", help="Results file (default: results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)  # Child process mode
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)  # Only generate the catalog
+    args = parser.parse_args()
+
+    if args.size is not None:
+        if args.prepare:
+            from synthetic_catalog import cached_catalog
+            cached_catalog(CACHE_DIR, args.size, args.dim, args.seed)
+            return
+        print(json.dumps(run_size(args)))
+        return
+
+    commit = git_commit()
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"Benchmarking {size} courses...", flush=True)
+        # Generate a missing catalog in its own process: its memory would
+        # otherwise show up in the measuring process's peak RSS
+        prepare = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--prepare", "--size", str(size),
+             "--dim", str(args.dim), "--seed", str(args.seed)],
+            cwd=HERE, capture_output=True, text=True
+        )
+        if prepare.returncode != 0:
+            lines = prepare.stderr.strip().splitlines()
+            results.append({"size": size, "error": lines[-1] if lines else f"exit {prepare.returncode}"})
+            continue
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--size", str(size),
+             "--dim", str(args.dim), "--seed", str(args.seed),
+             "--concurrency", str(args.concurrency), "--requests", str(args.requests),
+             "--max-graph-size", str(args.max_graph_size)],
+            cwd=HERE, capture_output=True, text=True
+        )
+        if child.returncode != 0:
+            lines = child.stderr.strip().splitlines()
+            results.append({"size": size, "error": lines[-1] if lines else f"exit {child.returncode}"})
+            continue
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "dim": args.dim, "seed": args.seed, "concurrency": args.concurrency,
+            "requests": args.requests, "max_graph_size": args.max_graph_size,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print()
+    print_table(results)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
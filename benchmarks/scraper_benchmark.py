@@ -0,0 +1,172 @@
+"""
+Listing-page parsing benchmark for the data scraper.
+
+Times the single-pass extractor (scripts/data-scraper/src/extract.py) with
+each available parser backend against the previous per-course
+BeautifulSoup implementation, on saved listing pages. Without --pages,
+synthetic WordPress-style listings with --sizes courses are generated and
+cached in .cache/. Every run checks that all implementations extract the
+same courses.
+
+    python scraper_benchmark.py --sizes 2000,5000
+    python scraper_benchmark.py --pages saved/all-courses.html --output scraper.json
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+from bs4 import BeautifulSoup
+
+from synthetic_catalog import DELIVERY_METHODS, DEPARTMENTS, FIRST_NAMES, LAST_NAMES, make_vocabulary
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(HERE, ".cache")
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "scripts", "data-scraper"))
+
+from src.extract import BACKENDS, FIELDNAMES, parse_listing  # noqa: E402
+
+SCHEDULES = ["M/Th 10:00AM - 11:50AM", "Tu/F 2:10PM - 4:00PM", "W 8:30AM - 12:10PM", "Tuesdays only"]
+
+
+def generate_listing(path, num_courses, seed=42):
+    """Write a listing page shaped like the curriculum site's category pages"""
+    rng = np.random.default_rng(seed)
+    words = make_vocabulary()
+    parts = ['<!DOCTYPE html><html><head><title>All Courses</title>'
+             '<link rel="next" href="/page/2/"></head><body><div id="page"><main id="main">']
+    for i in range(num_courses):
+        name, prefixes, _ = DEPARTMENTS[i % len(DEPARTMENTS)]
+        code = f"{prefixes[i % len(prefixes)]}{1000 + i % 9000}.{1 + i % 3:02d}"
+        title = " ".join(words[j] for j in rng.integers(0, len(words), size=4)).title()
+        note = " (cancelled 1/5/2024)" if i % 50 == 0 else ""
+        faculty = f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[(i * 3) % len(LAST_NAMES)]}"
+        excerpt = " ".join(words[j] for j in rng.integers(0, len(words), size=60))
+        delivery = DELIVERY_METHODS[i % 20 == 0][0]
+        categories = ''.join(f'<a href="/category/{c.lower().replace(" ", "-")}/" rel="tag">{c}</a>, '
+                             for c in ("All Courses", name or "First-Year Forum"))
+        parts.append(
+            f'<article id="post-{i}" class="post-{i} post type-post status-publish">'
+            f'<header class="entry-header"><h1 class="entry-title">'
+            f'<a href="/spring2024/course-{i}/" rel="bookmark">{title} ({code}){note}</a></h1></header>'
+            f'<div class="entry-content"><div class="faculty">{faculty}<br/>\n'
+            f'{SCHEDULES[i % len(SCHEDULES)]} (Spring 2024)<br/>\nDelivery Method: {delivery}</div>'
+            f'<p>{excerpt}</p><p><a class="more-link" href="/spring2024/course-{i}/">Continue reading</a></p></div>'
+            f'<footer class="entry-meta">Posted in {categories}<span class="edit-link"></span></footer>'
+            f'</article>'
+        )
+    parts.append('</main></div></body></html>')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
+    return path
+
+
+def cached_listing(cache_dir, num_courses, seed=42):
+    path = os.path.join(cache_dir, f"listing-{num_courses}-s{seed}.html")
+    if not os.path.exists(path):
+        tmp = path + ".tmp"
+        generate_listing(tmp, num_courses, seed)
+        os.replace(tmp, path)
+    return path
+
+
+def legacy_parse(html):
+    """The scraper's previous implementation: find_next per course and re-parsed fragments"""
+    soup = BeautifulSoup(html, 'html.parser')
+    courses = []
+    for header in soup.find_all('header', class_='entry-header'):
+        course = {field: '' for field in FIELDNAMES}
+        title_element = header.find('h1', class_='entry-title')
+        link_element = title_element.find('a') if title_element else None
+        if link_element:
+            full_title = link_element.text.strip()
+            code_match = re.search(r'\(([A-Z]{2,4}\d{4}\.\d{2}[^)]*)\)', full_title)
+            if code_match:
+                course['Course Code'] = code_match.group(1).strip()
+                title = re.sub(r'\s*\([A-Z]{2,4}\d{4}\.\d{2}[^)]*\)\s*', '', full_title).strip()
+            else:
+                title = full_title
+            course['Title'] = re.sub(
+                r'\s*\((cancelled|day\/time updated|time updated as of|new course code|method)[^)]*\)\s*', '', title).strip()
+            course['URL'] = link_element.get('href')
+
+        faculty_element = header.find_next('div', class_='faculty')
+        if faculty_element:
+            faculty_html = str(faculty_element)
+            faculty_parts = faculty_html.split('<br/>')
+            course['Faculty'] = BeautifulSoup(faculty_parts[0], 'html.parser').get_text().strip()
+            if len(faculty_parts) > 1 and re.search(
+                    r'[MTWFS][a-z]*(/[MTWFS][a-z]*)?\s+\d+:\d+[AP]M\s*-\s*\d+:\d+[AP]M', faculty_parts[1]):
+                course['Schedule'] = BeautifulSoup(faculty_parts[1], 'html.parser').get_text().strip()
+            delivery_match = re.search(r'Delivery Method:\s*([^<]+)', faculty_html)
+            if delivery_match:
+                course['Delivery Method'] = f"Delivery Method: {delivery_match.group(1).strip()}"
+
+        meta_element = header.find_next('footer', class_='entry-meta')
+        if meta_element:
+            course['Categories'] = '; '.join(a.text.strip() for a in meta_element.find_all('a', rel='tag'))
+        courses.append(course)
+    return courses
+
+
+def time_parser(parse, html, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        courses = parse(html)
+        best = min(best, time.perf_counter() - start)
+    return best, courses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing-page parsing in the data scraper")
+    parser.add_argument("--sizes", default="2000,5000", help="Courses per generated listing (comma-separated)")
+    parser.add_argument("--pages", nargs="+", help="Saved listing pages to parse instead of generated ones")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser; the best is reported")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    pages = args.pages or [cached_listing(CACHE_DIR, int(size), args.seed) for size in args.sizes.split(",")]
+    parsers = [("legacy (bs4 find_next)", legacy_parse)]
+    parsers += [(f"single-pass ({backend})", lambda html, b=backend: parse_listing(html, b)[0]) for backend in BACKENDS]
+
+    results = []
+    for path in pages:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        baseline = None
+        for label, parse in parsers:
+            seconds, courses = time_parser(parse, html, args.repeat)
+            if baseline is None:
+                baseline = (seconds, courses)
+            elif courses != baseline[1]:
+                mismatches = sum(a != b for a, b in zip(courses, baseline[1])) + abs(len(courses) - len(baseline[1]))
+                print(f"warning: {label} differs from the legacy parser on {mismatches} courses in {path}")
+            results.append({
+                "page": os.path.basename(path),
+                "megabytes": round(len(html.encode('utf-8')) / 1e6, 2),
+                "parser": label,
+                "courses": len(courses),
+                "seconds": round(seconds, 4),
+                "courses_per_s": round(len(courses) / seconds) if seconds else None,
+                "speedup": round(baseline[0] / seconds, 1) if seconds else None,
+            })
+
+    print(f"{'page':<28}{'MB':>7}{'parser':>28}{'courses':>9}{'seconds':>10}{'courses/s':>11}{'speedup':>9}")
+    for r in results:
+        print(f"{r['page']:<28}{r['megabytes']:>7}{r['parser']:>28}{r['courses']:>9}"
+              f"{r['seconds']:>10}{r['courses_per_s']:>11}{r['speedup']:>8}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
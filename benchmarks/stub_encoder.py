@@ -0,0 +1,66 @@
+"""
+Deterministic CPU stand-in for NV-Embed-v2.
+
+Texts are embedded as the normalized sum of fixed random word vectors, so
+texts sharing vocabulary land close together and every run produces the
+same vectors. It implements the subset of the SentenceTransformer interface
+the backend uses (encode() and tokenizer.eos_token).
+"""
+import re
+import zlib
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with the attributes the embedding code reads"""
+    eos_token = "</s>"
+
+    def __call__(self, texts, add_special_tokens=False):
+        if isinstance(texts, str):
+            return {"input_ids": texts.split()}
+        return {"input_ids": [text.split() for text in texts]}
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join(ids)
+
+
+class StubEncoder:
+    """Bag-of-words random-projection encoder"""
+
+    def __init__(self, vocabulary, dim=256, seed=1234):
+        self.vocabulary = list(vocabulary)
+        self.word_ids = {word: i for i, word in enumerate(self.vocabulary)}
+        self.dim = dim
+        rng = np.random.default_rng(seed)
+        self.table = rng.standard_normal((len(self.vocabulary), dim)).astype(np.float32)
+        self.tokenizer = StubTokenizer()
+
+    def token_ids(self, text):
+        """Vocabulary row for each word; unknown words hash onto the table"""
+        text = text.replace(self.tokenizer.eos_token, " ").lower()
+        ids = []
+        for word in TOKEN_RE.findall(text):
+            index = self.word_ids.get(word)
+            if index is None:
+                index = zlib.crc32(word.encode("utf-8")) % len(self.vocabulary)
+            ids.append(index)
+        return ids
+
+    def embed_ids(self, id_lists):
+        """Embed pre-tokenized documents (lists of vocabulary rows) in one pass"""
+        lengths = np.array([len(ids) for ids in id_lists], dtype=np.int64)
+        out = np.zeros((len(id_lists), self.dim), dtype=np.float32)
+        nonempty = lengths > 0
+        if nonempty.any():
+            flat = np.concatenate([np.asarray(ids, dtype=np.int64) for ids in id_lists if len(ids)])
+            offsets = np.concatenate([[0], np.cumsum(lengths[nonempty])[:-1]])
+            out[nonempty] = np.add.reduceat(self.table[flat], offsets, axis=0)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=True, prompt=None, **kwargs):
+        return self.embed_ids([self.token_ids(text) for text in texts])
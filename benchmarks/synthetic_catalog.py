@@ -0,0 +1,159 @@
+"""
+Synthetic course catalogs in the backend's CSV schema.
+
+Department mix, section counts, delivery methods and description lengths
+follow the real catalog in data/course-data.csv; descriptions are drawn from
+per-department topic words plus a shared pool so departments cluster in
+embedding space. Catalogs are cached on disk by (size, dim, seed).
+"""
+import csv
+import json
+import os
+
+import numpy as np
+
+from stub_encoder import StubEncoder
+
+HEADER = [
+    'Course', 'Name', 'Start Date', 'End Date', 'Start Access Date', 'End Access Date',
+    'Section', 'Primary Faculty First Name', 'Primary Faculty Last Name',
+    'Primary Faculty Email Address', 'Department', 'Delivery Method', 'Description',
+    'Embedding'
+]
+
+# (department, course code prefixes, share of sections) from data/course-data.csv
+DEPARTMENTS = [
+    ("Music", ["MIN", "MCO", "MVO", "MHI", "MPF"], 0.158),
+    ("Dance", ["DAN"], 0.153),
+    ("Visual Arts", ["VA", "PHO", "CER", "DRW", "PAI", "SCU", "DES", "PRI", "FV"], 0.149),
+    ("Society Culture and Thought", ["SCT", "ANT", "HIS", "PHI", "POL", "PSY"], 0.110),
+    ("Science and Mathematics", ["BIO", "CHE", "CS", "MAT", "PHY"], 0.105),
+    ("Drama", ["DRA"], 0.094),
+    ("Literature", ["LIT"], 0.066),
+    ("Cultural Studies and Languages", ["SPA", "FRE", "JPN", "CHI", "LIN", "CSL"], 0.060),
+    ("Advancement of Public Action", ["APA", "PEC"], 0.055),
+    ("", ["FYF"], 0.030),
+    ("Writing", ["WRI"], 0.009),
+    ("Environment", ["ENV"], 0.007),
+    ("Education", ["EDU"], 0.005),
+]
+
+DELIVERY_METHODS = [("On Campus", 0.945), ("Online", 0.041), ("Hybrid", 0.014)]
+
+TOPIC_WORDS_PER_DEPARTMENT = 300
+COMMON_WORDS = 2000
+# Share of description words drawn from the department's topic pool
+TOPIC_SHARE = 0.4
+
+# Description length in words: lognormal around the real median of ~140,
+# with a small tail of very long descriptions
+LENGTH_MEDIAN = 140
+LENGTH_SIGMA = 0.45
+LONG_TAIL_SHARE = 0.01
+MAX_WORDS = 3000
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pa",
+             "qu", "den", "mar", "sol", "tri", "bel", "cor", "fin", "gra", "hel"]
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]
+LAST_NAMES = ["Lyon", "Park", "Singh", "Garcia", "Chen", "Okafor", "Meyer", "Rossi"]
+
+
+def make_vocabulary():
+    """Deterministic pseudo-words: one shared pool plus one topic pool per department"""
+    total = COMMON_WORDS + TOPIC_WORDS_PER_DEPARTMENT * len(DEPARTMENTS)
+    words = []
+    n = len(SYLLABLES)
+    i = 0
+    while len(words) < total:
+        a, b, c = i % n, (i // n) % n, (i // (n * n)) % n
+        words.append(SYLLABLES[a] + SYLLABLES[b] + SYLLABLES[c] + (str(i // (n ** 3)) if i >= n ** 3 else ""))
+        i += 1
+    return words
+
+
+def make_encoder(dim=256):
+    """The stub encoder matching the vocabulary used for synthetic catalogs"""
+    return StubEncoder(make_vocabulary(), dim=dim)
+
+
+def make_queries(count, seed=7):
+    """Short topical queries, drawn from department topic pools"""
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary()
+    queries = []
+    for _ in range(count):
+        dept = rng.integers(len(DEPARTMENTS))
+        base = COMMON_WORDS + dept * TOPIC_WORDS_PER_DEPARTMENT
+        ids = rng.integers(base, base + TOPIC_WORDS_PER_DEPARTMENT, size=rng.integers(3, 7))
+        queries.append(" ".join(vocabulary[i] for i in ids))
+    return queries
+
+
+def generate_catalog(path, num_courses, dim=256, seed=42):
+    """
+    Write a catalog with num_courses courses (and extra section rows) to path.
+
+    Embeddings are computed with the stub encoder directly from word ids,
+    which gives the same vectors as encoding the written descriptions.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary()
+    words = np.array(vocabulary, dtype=object)
+    encoder = StubEncoder(vocabulary, dim=dim)
+
+    shares = np.array([d[2] for d in DEPARTMENTS])
+    departments = rng.choice(len(DEPARTMENTS), size=num_courses, p=shares / shares.sum())
+
+    lengths = rng.lognormal(np.log(LENGTH_MEDIAN), LENGTH_SIGMA, size=num_courses)
+    long_tail = rng.random(num_courses) < LONG_TAIL_SHARE
+    lengths[long_tail] *= rng.uniform(4, 15, size=long_tail.sum())
+    lengths = np.clip(lengths, 10, MAX_WORDS).astype(np.int64)
+
+    delivery_names = [d[0] for d in DELIVERY_METHODS]
+    delivery_p = np.array([d[1] for d in DELIVERY_METHODS])
+
+    id_lists = []
+    for dept, length in zip(departments, lengths):
+        topic = rng.random(length) < TOPIC_SHARE
+        ids = rng.integers(0, COMMON_WORDS, size=length)
+        base = COMMON_WORDS + dept * TOPIC_WORDS_PER_DEPARTMENT
+        ids[topic] = rng.integers(base, base + TOPIC_WORDS_PER_DEPARTMENT, size=topic.sum())
+        id_lists.append(ids)
+
+    embeddings = encoder.embed_ids(id_lists)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(num_courses):
+            name, prefixes, _ = DEPARTMENTS[departments[i]]
+            prefix = prefixes[i % len(prefixes)]
+            code = f"{prefix} {1000 + i % 9000}.{i // 9000:02d}"
+            title = " ".join(words[id_lists[i][:4]]).title()
+            description = " ".join(words[id_lists[i]].tolist())
+            embedding = json.dumps(np.round(embeddings[i], 6).tolist())
+            delivery = delivery_names[rng.choice(len(delivery_names), p=delivery_p)]
+
+            # About one course in ten has a second section
+            sections = 2 if rng.random() < 0.1 else 1
+            for section in range(1, sections + 1):
+                first = FIRST_NAMES[(i + section) % len(FIRST_NAMES)]
+                last = LAST_NAMES[(i * 3 + section) % len(LAST_NAMES)]
+                writer.writerow([
+                    code, title, "9/3/2024", "12/13/2024", "9/3/2024", "12/13/2024",
+                    str(section), first, last, f"{first.lower()}{last.lower()}@example.edu",
+                    name, delivery, description, embedding
+                ])
+    return path
+
+
+def cached_catalog(cache_dir, num_courses, dim=256, seed=42):
+    """Path to a generated catalog, generating it on first use"""
+    path = os.path.join(cache_dir, f"catalog-{num_courses}-d{dim}-s{seed}.csv")
+    if not os.path.exists(path):
+        tmp = path + ".tmp"
+        generate_catalog(tmp, num_courses, dim, seed)
+        os.replace(tmp, path)
+    return path
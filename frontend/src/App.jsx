@@ -3,13 +3,27 @@ import './App.css'
 import { useCoursesData } from './hooks/useCoursesData'
 import { useGraphSetup } from './hooks/useGraphSetup'
 import { useSearch } from './hooks/useSearch'
+import { useClusterGraph } from './hooks/useClusterGraph'
+import { useGraphUpdates } from './hooks/useGraphUpdates'
+import { useGraphBundle } from './hooks/useGraphBundle'
+import { GRAPH_BUNDLE_URL } from './config/api'
 import { assignDepartmentColors } from './utils/colorUtils'
 import GraphVisualization from './components/GraphVisualization'
 import SearchInput from './components/SearchInput'
 
+// Static bundle mode: load the prebuilt graph and layout, with no backend calls
+const BUNDLED_GRAPH = Boolean(GRAPH_BUNDLE_URL);
+// Level-of-detail mode: start from cluster super-nodes and expand them on click
+const CLUSTERED_GRAPH = !BUNDLED_GRAPH && import.meta.env.VITE_GRAPH_LOD === 'true';
+
 function App() {
-  // Load course data
-  const { coursesData, loading, error, departments, similarities } = useCoursesData();
+  // Load course data (the full graph, unless bundle or clustered mode is on)
+  const courses = useCoursesData(!CLUSTERED_GRAPH && !BUNDLED_GRAPH);
+  const clustered = useClusterGraph(CLUSTERED_GRAPH);
+  const bundled = useGraphBundle(BUNDLED_GRAPH);
+  const { coursesData, similarities } = courses;
+  const view = BUNDLED_GRAPH ? bundled : CLUSTERED_GRAPH ? clustered : null;
+  const { loading, error, departments } = view || courses;
   
   // Debug data loading
   console.log('coursesData length:', coursesData.length);
@@ -24,16 +38,27 @@ function App() {
   }, [departments]);
   console.log('departmentColors:', departmentColors);
   
+  const applyDepartmentColors = view ? view.applyDepartmentColors : null;
+  useEffect(() => {
+    if (applyDepartmentColors) applyDepartmentColors(departmentColors);
+  }, [departmentColors, applyDepartmentColors]);
+  
   // Set up refs for hover/selection to avoid re-renders
   const hoveredNodeRef = useRef(null);
   const hoveredNeighborsRef = useRef(null);
   const sigmaRef = useRef(null);
   
   // Add state to track when graph is ready
-  const [graphReady, setGraphReady] = useState(false);
+  const [fullGraphReady, setGraphReady] = useState(false);
   
   // Set up graph
-  const graphRef = useGraphSetup(coursesData, departments, departmentColors, setGraphReady, similarities);
+  const fullGraphRef = useGraphSetup(coursesData, departments, departmentColors, setGraphReady, similarities);
+  const graphRef = view ? view.graphRef : fullGraphRef;
+  const graphReady = view ? view.graphReady : fullGraphReady;
+  
+  // Apply added/edited/removed courses to the full graph as they happen
+  useGraphUpdates(fullGraphRef, !view && fullGraphReady, courses.version, courses.loadCount,
+    departmentColors, courses.reload);
   console.log('graph nodes:', graphRef.current ? graphRef.current.nodes().length : 0);
   console.log('graph ready:', graphReady);
   
@@ -71,6 +96,7 @@ function App() {
         handleSearchBlur={handleSearchBlur}
         handleSearchKeyDown={handleSearchKeyDown}
         graph={graphRef.current}
+        suggest={BUNDLED_GRAPH && graphReady ? bundled.suggest : null}
       />
       
       {graphReady && graphRef.current ? (
@@ -81,6 +107,7 @@ function App() {
           hoveredNeighborsRef={hoveredNeighborsRef}
           selectedNodeRef={selectedNodeRef}
           sigmaRef={sigmaRef}
+          onNodeClick={CLUSTERED_GRAPH ? clustered.expandCluster : undefined}
         />
       ) : (
         <div className="loading">Preparing graph visualization...</div>
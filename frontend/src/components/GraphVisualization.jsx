@@ -13,7 +13,8 @@ const GraphVisualization = ({
   hoveredNodeRef, 
   hoveredNeighborsRef, 
   selectedNodeRef, 
-  sigmaRef
+  sigmaRef,
+  onNodeClick
 }) => {
   const containerRef = useRef(null);
   
@@ -200,6 +201,13 @@ const GraphVisualization = ({
         sigmaRef.current.refresh({ skipIndexation: true });
       });
       
+      // In clustered mode, clicking a super-node expands it
+      if (onNodeClick) {
+        sigmaRef.current.on("clickNode", ({ node }) => {
+          onNodeClick(node);
+        });
+      }
+      
       sigmaRef.current.on("leaveNode", () => {
         hoveredNodeRef.current = null;
         hoveredNeighborsRef.current = null;
@@ -380,7 +388,7 @@ const GraphVisualization = ({
         container.removeChild(buttonsContainer);
       }
     };
-  }, [graph, departmentColors, hoveredNodeRef, hoveredNeighborsRef, selectedNodeRef, sigmaRef]);
+  }, [graph, departmentColors, hoveredNodeRef, hoveredNeighborsRef, selectedNodeRef, sigmaRef, onNodeClick]);
 
   return (
     <div 
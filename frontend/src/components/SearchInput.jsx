@@ -9,10 +9,15 @@ const SearchInput = memo(({
   handleSearchSelect,
   handleSearchBlur, 
   handleSearchKeyDown,
-  graph 
+  graph,
+  suggest
 }) => {
-  // Create datalist options once
-  const options = graph ? 
+  // With a suggest index (static bundle), only the courses matching what was typed;
+  // otherwise every course in the graph
+  const options = suggest ?
+    suggest(searchQuery).map(({ id, label }) => (
+      <option key={id} value={label} />
+    )) : graph ? 
     graph.nodes().map(node => (
       <option key={node} value={graph.getNodeAttribute(node, "label")} />
     )) : [];
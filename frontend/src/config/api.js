@@ -0,0 +1,25 @@
+/**
+ * Backend location and the dataset shard (e.g. an academic term) to show
+ */
+export const API_BASE = 'http://localhost:8001';
+
+// Set VITE_COURSE_SHARD to view one shard; the backend's default shard otherwise
+export const COURSE_SHARD = import.meta.env.VITE_COURSE_SHARD || '';
+
+// Set VITE_GRAPH_BUNDLE_URL to the manifest.json written by backend/export_bundle.py
+// to load the graph from a static bundle instead of the backend
+export const GRAPH_BUNDLE_URL = import.meta.env.VITE_GRAPH_BUNDLE_URL || '';
+
+/**
+ * Builds a backend URL scoped to the configured shard
+ * @param {string} path - API path, e.g. '/api/graph-data'
+ * @param {Object} params - Extra query parameters
+ * @returns {string} - The full URL
+ */
+export const apiUrl = (path, params = {}) => {
+  const query = new URLSearchParams({
+    ...(COURSE_SHARD ? { shard: COURSE_SHARD } : {}),
+    ...params
+  }).toString();
+  return `${API_BASE}${path}${query ? `?${query}` : ''}`;
+};
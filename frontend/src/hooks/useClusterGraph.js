@@ -0,0 +1,174 @@
+import { useState, useEffect, useRef, useCallback } from 'react';
+import Graph from 'graphology';
+import { random } from 'graphology-layout';
+import forceAtlas2 from 'graphology-layout-forceatlas2';
+import { FORCE_ATLAS_SETTINGS } from '../config/colors';
+import { getGraphBounds } from '../utils/graphUtils';
+import { apiUrl } from '../config/api';
+
+// Only centroid/course pairs at least this similar get an edge
+const CLUSTER_EDGE_THRESHOLD = 0.3;
+
+/**
+ * Graph attributes for a cluster super-node or a course node
+ * @param {Object} node - Node from the API (type 'cluster' or 'course')
+ * @param {number} x - Initial x position
+ * @param {number} y - Initial y position
+ * @param {Object} departmentColors - Mapping of department names to colors
+ * @returns {Object} - Node attributes
+ */
+const nodeAttributes = (node, x, y, departmentColors) => {
+  const isCluster = node.type === 'cluster';
+  return {
+    label: isCluster ? `${node.label} (${node.size})` : node.name,
+    code: node.code || '',
+    department: node.department,
+    departmentLabel: node.department,
+    nodeType: node.type,
+    // Super-nodes grow with the number of courses they stand for
+    size: isCluster ? 6 + Math.sqrt(node.size) * 1.5 : 8,
+    color: departmentColors[node.department] || '#8395a7',
+    x: x,
+    y: y,
+    type: 'circle'
+  };
+};
+
+/**
+ * Adds edges between the given node ids from a similarities map
+ * @param {Object} graph - The graph instance
+ * @param {Object} similarities - Map of "id1,id2" to similarity
+ * @param {Set} nodeIds - Node ids that may be connected
+ */
+const addSimilarityEdges = (graph, similarities, nodeIds) => {
+  for (const key in similarities) {
+    const similarity = similarities[key];
+    if (similarity < CLUSTER_EDGE_THRESHOLD) continue;
+    const [source, target] = key.split(',');
+    // Keys come in both directions; add each pair once
+    if (source < target && nodeIds.has(source) && nodeIds.has(target) && !graph.hasEdge(source, target)) {
+      graph.addEdge(source, target, {
+        size: 0.5,
+        weight: 1 + similarity * 19,
+        color: '#55555566',
+        similarity: similarity
+      });
+    }
+  }
+};
+
+/**
+ * Custom hook for the level-of-detail graph: starts from the top level of the
+ * backend's cluster hierarchy and expands one cluster at a time on demand, so
+ * only what is visible is downloaded and rendered.
+ * @param {boolean} enabled - Whether clustered mode is active
+ * @returns {Object} - Graph ref, readiness/loading/error state, departments, expandCluster and applyDepartmentColors
+ */
+export const useClusterGraph = (enabled) => {
+  const graphRef = useRef(null);
+  const colorsRef = useRef({});
+  const [graphReady, setGraphReady] = useState(false);
+  const [loading, setLoading] = useState(enabled);
+  const [error, setError] = useState(null);
+  const [departments, setDepartments] = useState(new Set());
+
+  // Load the top level of the hierarchy
+  useEffect(() => {
+    if (!enabled) return;
+
+    fetch(apiUrl('/api/graph-data', { level: 0 }))
+      .then(response => {
+        if (!response.ok) {
+          throw new Error('Failed to fetch cluster data from API');
+        }
+        return response.json();
+      })
+      .then(data => {
+        console.log('Received cluster level from API:', {
+          level: data.level,
+          levels: data.levels,
+          nodesCount: data.nodes.length
+        });
+
+        const graph = new Graph();
+        data.nodes.forEach(node => graph.addNode(node.id, nodeAttributes(node, 0, 0, colorsRef.current)));
+        addSimilarityEdges(graph, data.similarities, new Set(data.nodes.map(node => node.id)));
+
+        random.assign(graph);
+        forceAtlas2.assign(graph, { ...FORCE_ATLAS_SETTINGS, iterations: 200 });
+
+        graphRef.current = graph;
+        setDepartments(new Set(data.departments));
+        setGraphReady(true);
+        setLoading(false);
+      })
+      .catch(error => {
+        console.error('Error fetching cluster data:', error);
+        setError(error.message);
+        setLoading(false);
+      });
+  }, [enabled]);
+
+  /**
+   * Sets the department colors used for current and future nodes
+   * @param {Object} departmentColors - Mapping of department names to colors
+   */
+  const applyDepartmentColors = useCallback((departmentColors) => {
+    colorsRef.current = departmentColors;
+    const graph = graphRef.current;
+    if (!graph) return;
+    graph.forEachNode((nodeId, attrs) => {
+      graph.setNodeAttribute(nodeId, 'color', departmentColors[attrs.department] || '#8395a7');
+    });
+  }, []);
+
+  /**
+   * Replaces a cluster super-node with its children (or member courses),
+   * laid out around the cluster's position and linked to the nodes still shown
+   * @param {string} clusterId - Id of the cluster node to expand
+   */
+  const expandCluster = useCallback((clusterId) => {
+    const graph = graphRef.current;
+    if (!graph || !graph.hasNode(clusterId) || graph.getNodeAttribute(clusterId, 'nodeType') !== 'cluster') {
+      return;
+    }
+
+    // The backend also returns similarities between the new nodes and these;
+    // sent in the body, since an explored graph can hold thousands of ids
+    const visible = graph.nodes().filter(nodeId => nodeId !== clusterId);
+    fetch(apiUrl('/api/graph-data/expand'), {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ cluster: clusterId, visible: visible })
+    })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`Failed to expand cluster ${clusterId}`);
+        }
+        return response.json();
+      })
+      .then(data => {
+        if (!graph.hasNode(clusterId)) return;
+        const { x, y, size } = graph.getNodeAttributes(clusterId);
+        graph.dropNode(clusterId);
+
+        // Place children on a ring around the old super-node, scaled to the graph
+        const bounds = getGraphBounds(graph);
+        const radius = Math.max(size * 2, Math.max(bounds.width, bounds.height) * 0.05);
+        data.nodes.forEach((node, i) => {
+          const angle = (2 * Math.PI * i) / data.nodes.length;
+          if (!graph.hasNode(node.id)) {
+            graph.addNode(node.id, nodeAttributes(node, x + radius * Math.cos(angle), y + radius * Math.sin(angle), colorsRef.current));
+          }
+        });
+        // Edges among the new nodes and from them to the rest of the graph
+        addSimilarityEdges(graph, data.similarities, new Set(graph.nodes()));
+        console.log(`Expanded ${clusterId} into ${data.nodes.length} nodes (level ${data.level})`);
+      })
+      .catch(error => {
+        console.error('Error expanding cluster:', error);
+      });
+  }, []);
+
+  return { graphRef, graphReady, loading, error, departments, expandCluster, applyDepartmentColors };
+};
@@ -1,24 +1,35 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
+import { apiUrl } from '../config/api';
 
 /**
  * Custom hook to load and process course data from the backend API
- * @returns {Object} - Object containing course data, loading state, error state, and departments
+ * @param {boolean} enabled - Whether to load the full graph (false in clustered mode)
+ * @returns {Object} - Object containing course data, loading state, error state, departments,
+ *   the graph data version, how many times data has loaded and a reload function
  */
-export const useCoursesData = () => {
+export const useCoursesData = (enabled = true) => {
   const [coursesData, setCoursesData] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [loading, setLoading] = useState(enabled);
   const [error, setError] = useState(null);
   const [departments, setDepartments] = useState(new Set());
   const [similarities, setSimilarities] = useState({});
+  const [version, setVersion] = useState(0);
+  // Bumped to fetch again; later changes arrive as live updates instead
+  const [reloadCount, setReloadCount] = useState(0);
+  const reload = useCallback(() => setReloadCount(count => count + 1), []);
+  // Bumped every time data arrives, even if its version did not change
+  const [loadCount, setLoadCount] = useState(0);
 
   useEffect(() => {
-    // Define the API endpoint URL
-    const apiUrl = 'http://localhost:8001/api/graph-data';
+    if (!enabled) return;
     
-    console.log('Fetching course data from API:', apiUrl);
+    // Define the API endpoint URL (scoped to the configured shard)
+    const graphDataUrl = apiUrl('/api/graph-data');
+    
+    console.log('Fetching course data from API:', graphDataUrl);
     
     // Fetch data from the backend API
-    fetch(apiUrl)
+    fetch(graphDataUrl)
       .then(response => {
         if (!response.ok) {
           throw new Error('Failed to fetch courses data from API');
@@ -47,7 +58,8 @@ export const useCoursesData = () => {
           "",                 // ... (other fields)
           node.department,    // department (row[10])
           "",                 // delivery method (row[11])
-          node.description    // description (row[12])
+          node.description,   // description (row[12])
+          node.id             // backend node id (row[13]), used as the graph key
         ]);
         
         setCoursesData(formattedCourses);
@@ -59,6 +71,10 @@ export const useCoursesData = () => {
         const deptSet = new Set(data.departments);
         setDepartments(deptSet);
         
+        // Last live update already included in this data
+        setVersion(data.version || 0);
+        setLoadCount(count => count + 1);
+        
         setLoading(false);
       })
       .catch(error => {
@@ -66,7 +82,7 @@ export const useCoursesData = () => {
         setError(error.message);
         setLoading(false);
       });
-  }, []);
+  }, [enabled, reloadCount]);
 
-  return { coursesData, loading, error, departments, similarities };
+  return { coursesData, loading, error, departments, similarities, version, loadCount, reload };
 }; 
\ No newline at end of file
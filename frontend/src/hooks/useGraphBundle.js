@@ -0,0 +1,190 @@
+import { useState, useEffect, useRef, useCallback } from 'react';
+import Graph from 'graphology';
+import { GRAPH_BUNDLE_URL } from '../config/api';
+
+// Bundle layout this code reads (the "format" field written by export_bundle.py)
+const BUNDLE_FORMAT = 1;
+// Similarities are stored in thousandths
+const SIMILARITY_SCALE = 1000;
+
+/**
+ * Parses a bundle response, gunzipping it unless the CDN already did
+ * (when it is served with Content-Encoding: gzip)
+ * @param {Response} response - The bundle fetch response
+ * @returns {Promise<Object>} - The bundle contents
+ */
+const readBundle = async (response) => {
+  const bytes = new Uint8Array(await response.arrayBuffer());
+  if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return JSON.parse(await new Response(stream).text());
+  }
+  return JSON.parse(new TextDecoder().decode(bytes));
+};
+
+/**
+ * Color of an edge: the department color within a department, translucent grey across
+ * @param {string} dept1 - Department of one end
+ * @param {string} dept2 - Department of the other end
+ * @param {number} similarity - Similarity of the two courses
+ * @param {Object} departmentColors - Mapping of department names to colors
+ * @returns {string} - The edge color
+ */
+const edgeColor = (dept1, dept2, similarity, departmentColors) => (
+  dept1 === dept2 && departmentColors[dept1]
+    ? departmentColors[dept1] + 'AA'
+    : '#555555' + Math.floor(similarity * 255).toString(16).padStart(2, '0')
+);
+
+/**
+ * Builds the graph from a bundle; positions come precomputed, so no layout runs here
+ * @param {Object} bundle - The bundle contents
+ * @returns {Object} - The graph instance
+ */
+const buildGraph = (bundle) => {
+  const { nodes, edges, departments } = bundle;
+  const graph = new Graph();
+
+  nodes.id.forEach((nodeId, i) => {
+    const department = departments[nodes.department[i]];
+    graph.addNode(nodeId, {
+      label: nodes.name[i],
+      code: nodes.code[i],
+      faculty: nodes.faculty[i],
+      department: department,
+      departmentLabel: department,
+      size: 8,
+      color: '#8395a7',
+      x: nodes.x[i],
+      y: nodes.y[i],
+      type: 'circle'
+    });
+  });
+
+  const similarities = edges.similarity.map(value => value / SIMILARITY_SCALE);
+  let minSimilarity = 1.0;
+  let maxSimilarity = 0.0;
+  similarities.forEach(similarity => {
+    if (similarity > maxSimilarity) maxSimilarity = similarity;
+    if (similarity < minSimilarity) minSimilarity = similarity;
+  });
+  edges.source.forEach((source, i) => {
+    const similarity = similarities[i];
+    graph.addEdge(nodes.id[source], nodes.id[edges.target[i]], {
+      size: 0.3,
+      // Same 1-20 weight scale as useGraphSetup
+      weight: maxSimilarity === minSimilarity ? 1 : 1 + (similarity - minSimilarity) / (maxSimilarity - minSimilarity) * 19,
+      color: '#55555566',
+      similarity: similarity
+    });
+  });
+  return graph;
+};
+
+/**
+ * Custom hook for the static graph bundle: loads the manifest at
+ * VITE_GRAPH_BUNDLE_URL, then the content-hashed bundle it names, and builds
+ * the full graph with its precomputed layout. No backend is involved.
+ * @param {boolean} enabled - Whether bundle mode is active
+ * @returns {Object} - Graph ref, readiness/loading/error state, departments, the bundle version,
+ *   applyDepartmentColors and suggest
+ */
+export const useGraphBundle = (enabled) => {
+  const graphRef = useRef(null);
+  const suggestRef = useRef(null);
+  const [graphReady, setGraphReady] = useState(false);
+  const [loading, setLoading] = useState(enabled);
+  const [error, setError] = useState(null);
+  const [departments, setDepartments] = useState(new Set());
+  const [version, setVersion] = useState(null);
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    const manifestUrl = new URL(GRAPH_BUNDLE_URL, window.location.href);
+    // The manifest is small and changes with every export; always revalidate it
+    fetch(manifestUrl, { cache: 'no-cache' })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error('Failed to fetch graph bundle manifest');
+        }
+        return response.json();
+      })
+      .then(manifest => {
+        if (manifest.format !== BUNDLE_FORMAT) {
+          throw new Error(`Unsupported graph bundle format ${manifest.format}`);
+        }
+        console.log('Loading graph bundle:', manifest.bundle, { nodes: manifest.nodes, edges: manifest.edges });
+        return fetch(new URL(manifest.bundle, manifestUrl))
+          .then(response => {
+            if (!response.ok) {
+              throw new Error(`Failed to fetch graph bundle ${manifest.bundle}`);
+            }
+            return readBundle(response);
+          })
+          .then(bundle => {
+            graphRef.current = buildGraph(bundle);
+            suggestRef.current = { ...bundle.suggest, ids: bundle.nodes.id };
+            setVersion(manifest.version);
+            setDepartments(new Set(bundle.departments));
+            setGraphReady(true);
+            setLoading(false);
+          });
+      })
+      .catch(error => {
+        console.error('Error loading graph bundle:', error);
+        setError(error.message);
+        setLoading(false);
+      });
+  }, [enabled]);
+
+  /**
+   * Colors nodes and same-department edges by department
+   * @param {Object} departmentColors - Mapping of department names to colors
+   */
+  const applyDepartmentColors = useCallback((departmentColors) => {
+    const graph = graphRef.current;
+    if (!graph) return;
+    graph.forEachNode((nodeId, attrs) => {
+      graph.setNodeAttribute(nodeId, 'color', departmentColors[attrs.department] || '#8395a7');
+    });
+    graph.forEachEdge((edge, attrs, source, target, sourceAttrs, targetAttrs) => {
+      graph.setEdgeAttribute(edge, 'color',
+        edgeColor(sourceAttrs.department, targetAttrs.department, attrs.similarity, departmentColors));
+    });
+  }, []);
+
+  /**
+   * Courses whose name, code or a later word of the name starts with the query,
+   * looked up in the bundle's sorted suggest index
+   * @param {string} query - What has been typed so far
+   * @param {number} limit - Maximum number of suggestions
+   * @returns {Array} - [{ id, label }] for matching courses
+   */
+  const suggest = useCallback((query, limit = 20) => {
+    const index = suggestRef.current;
+    const graph = graphRef.current;
+    const prefix = query.trim().toLowerCase();
+    if (!index || !graph || !prefix) return [];
+    const { key: keys, node: nodes, ids } = index;
+
+    // First key not sorting before the prefix
+    let lo = 0, hi = keys.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (keys[mid] < prefix) lo = mid + 1; else hi = mid;
+    }
+
+    const seen = new Set();
+    const matches = [];
+    for (let i = lo; i < keys.length && matches.length < limit && keys[i].startsWith(prefix); i++) {
+      const node = nodes[i];
+      if (seen.has(node)) continue;
+      seen.add(node);
+      matches.push({ id: ids[node], label: graph.getNodeAttribute(ids[node], 'label') });
+    }
+    return matches;
+  }, []);
+
+  return { graphRef, graphReady, loading, error, departments, version, applyDepartmentColors, suggest };
+};
@@ -51,7 +51,8 @@ export const useGraphSetup = (coursesData, departments, departmentColors, setGra
         const categoryText = row[6] || '';
         
         if (courseTitle && courseCode) {
-          const nodeId = `course-${index}`;
+          // Sections are merged server-side, so ids are not array positions
+          const nodeId = row[13] || `course-${index}`;
           const categories = categoryText ? categoryText.split(';').map(cat => cat.trim()).filter(cat => cat) : [];
           const department = extractDepartment(courseCode);
           
@@ -0,0 +1,138 @@
+import { useEffect, useRef } from 'react';
+import { extractDepartment } from '../utils/graphUtils';
+import { apiUrl } from '../config/api';
+
+// Same threshold the backend uses for delta edges and useGraphSetup draws
+const SIMILARITY_THRESHOLD = 0.3;
+
+/**
+ * Initial position for a new node: the average position of its existing
+ * neighbours, or the origin if it has none
+ * @param {Object} graph - The graph instance
+ * @param {string} nodeId - Id of the new node
+ * @param {Array} edges - Delta edges touching the node
+ * @returns {Object} - { x, y }
+ */
+const neighbourCentroid = (graph, nodeId, edges) => {
+  let x = 0, y = 0, count = 0;
+  edges.forEach(edge => {
+    const other = edge.source === nodeId ? edge.target : edge.source;
+    if (other !== nodeId && graph.hasNode(other)) {
+      x += graph.getNodeAttribute(other, 'x');
+      y += graph.getNodeAttribute(other, 'y');
+      count++;
+    }
+  });
+  // Small jitter so nodes added at the same spot do not overlap exactly
+  return count
+    ? { x: x / count + (Math.random() - 0.5) * 0.01, y: y / count + (Math.random() - 0.5) * 0.01 }
+    : { x: Math.random(), y: Math.random() };
+};
+
+/**
+ * Applies one delta event from the backend to the graph in place
+ * @param {Object} graph - The graph instance
+ * @param {Object} delta - { nodes, edges, removed_nodes, removed_edges }
+ * @param {Object} departmentColors - Mapping of department names to colors
+ */
+const applyDelta = (graph, delta, departmentColors) => {
+  delta.removed_nodes.forEach(nodeId => {
+    if (graph.hasNode(nodeId)) graph.dropNode(nodeId);
+  });
+  delta.removed_edges.forEach(({ source, target }) => {
+    if (graph.hasEdge(source, target)) graph.dropEdge(source, target);
+    if (graph.hasEdge(target, source)) graph.dropEdge(target, source);
+  });
+
+  delta.nodes.forEach(node => {
+    const department = extractDepartment(node.code);
+    if (!department) return;
+    const attributes = {
+      label: node.name,
+      code: node.code,
+      department: department,
+      departmentLabel: department,
+      color: departmentColors[department] || '#8395a7'
+    };
+    if (graph.hasNode(node.id)) {
+      graph.mergeNodeAttributes(node.id, attributes);
+    } else {
+      const edges = delta.edges.filter(edge => edge.source === node.id || edge.target === node.id);
+      graph.addNode(node.id, {
+        ...attributes,
+        ...neighbourCentroid(graph, node.id, edges),
+        size: 8,
+        categories: [],
+        type: 'circle'
+      });
+    }
+  });
+
+  delta.edges.forEach(({ source, target, similarity }) => {
+    if (similarity < SIMILARITY_THRESHOLD || !graph.hasNode(source) || !graph.hasNode(target)) return;
+    // Edges may already exist in either direction from the initial load
+    const existing = graph.edge(source, target) || graph.edge(target, source);
+    if (existing) {
+      graph.mergeEdgeAttributes(existing, { similarity: similarity, weight: 1 + similarity * 19 });
+      return;
+    }
+    const dept1 = graph.getNodeAttribute(source, 'department');
+    const dept2 = graph.getNodeAttribute(target, 'department');
+    graph.addEdge(source, target, {
+      size: 0.3,
+      weight: 1 + similarity * 19,
+      color: dept1 === dept2
+        ? (departmentColors[dept1] || '#8395a7') + 'AA'
+        : '#555555' + Math.floor(similarity * 255).toString(16).padStart(2, '0'),
+      similarity: similarity
+    });
+  });
+};
+
+/**
+ * Custom hook that subscribes to live graph updates (Server-Sent Events) and
+ * applies each delta to the already loaded graph, so added or edited courses
+ * appear without re-downloading the whole graph
+ * @param {Object} graphRef - Ref to the graph instance
+ * @param {boolean} enabled - Whether the graph is loaded and updates should be applied
+ * @param {number} version - Graph data version the graph was built from
+ * @param {number} loadCount - Increases with every graph data load; the stream is reopened after
+ *   each one, since a replaced shard can come back at the version the client already had
+ * @param {Object} departmentColors - Mapping of department names to colors
+ * @param {Function} onReset - Called when updates were missed and the graph must be reloaded
+ */
+export const useGraphUpdates = (graphRef, enabled, version, loadCount, departmentColors, onReset) => {
+  // Read through refs so new colors or callbacks do not reopen the stream
+  const colorsRef = useRef(departmentColors);
+  const onResetRef = useRef(onReset);
+  colorsRef.current = departmentColors;
+  onResetRef.current = onReset;
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    // The browser reconnects on its own and resumes from the last event id
+    const source = new EventSource(apiUrl('/api/graph-events', { since: version }));
+
+    source.addEventListener('delta', event => {
+      const graph = graphRef.current;
+      if (!graph) return;
+      const delta = JSON.parse(event.data);
+      applyDelta(graph, delta, colorsRef.current);
+      console.log(`Applied graph update ${delta.version}:`, {
+        nodes: delta.nodes.length,
+        edges: delta.edges.length,
+        removedNodes: delta.removed_nodes.length,
+        removedEdges: delta.removed_edges.length
+      });
+    });
+
+    source.addEventListener('reset', () => {
+      console.log('Missed graph updates, reloading graph data');
+      source.close();
+      if (onResetRef.current) onResetRef.current();
+    });
+
+    return () => source.close();
+  }, [graphRef, enabled, version, loadCount]);
+};
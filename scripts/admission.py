@@ -0,0 +1,137 @@
+"""
+Admission control for CPU-bound encoding.
+
+At most `max_concurrency` requests hold a slot at once and at most
+`max_queue` more wait for one; anything beyond that is rejected right away
+instead of queueing without bound. Waiting requests give up when their
+deadline passes or their client disconnects, so abandoned work never
+reaches the encoder. Rejections carry a Retry-After estimate from the
+queue length and recent service times.
+
+Slots are handed over on the event loop; the work itself should run in
+the threadpool while the slot is held.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import metrics
+
+# How often a waiting request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.25
+
+
+class Overloaded(Exception):
+    """The request was shed; retry after `retry_after` seconds"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ClientDisconnected(Exception):
+    """The client went away while its request was waiting"""
+
+
+class AdmissionController:
+    """Bounded concurrency plus a bounded wait queue, with shed metrics"""
+
+    def __init__(self, prefix, max_concurrency=1, max_queue=16, timeout=10.0, retry_after=1):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.retry_after = retry_after  # Lower bound for the Retry-After estimate
+        self.active = 0
+        self.waiters = deque()
+        self.service_time = None  # Moving average of seconds a slot is held
+
+        self.in_flight_gauge = metrics.REGISTRY.gauge(
+            f"{prefix}_admission_in_flight", "Requests holding an encoder slot")
+        self.queue_gauge = metrics.REGISTRY.gauge(
+            f"{prefix}_admission_queue_depth", "Requests waiting for an encoder slot")
+        self.shed_counter = metrics.REGISTRY.counter(
+            f"{prefix}_admission_shed_total", "Requests dropped before encoding", ["reason"])
+
+    def queue_depth(self):
+        return len(self.waiters)
+
+    def estimate_retry_after(self):
+        """Seconds until a new request would likely get a slot"""
+        if self.service_time is None:
+            return self.retry_after
+        wait = (len(self.waiters) + 1) * self.service_time / self.max_concurrency
+        return max(self.retry_after, math.ceil(wait))
+
+    def _shed(self, reason):
+        self.shed_counter.inc(reason=reason)
+        return Overloaded(reason, self.estimate_retry_after())
+
+    async def acquire(self, deadline, is_disconnected=None):
+        """
+        Wait for a slot until `deadline` (time.monotonic()). Raises Overloaded
+        when the queue is full or the deadline passes, ClientDisconnected
+        when is_disconnected() (an async callable) reports the client gone.
+        """
+        if self.active < self.max_concurrency and not self.waiters:
+            self.active += 1
+            self.in_flight_gauge.set(self.active)
+            return
+        if len(self.waiters) >= self.max_queue:
+            raise self._shed("queue_full")
+
+        slot = asyncio.get_running_loop().create_future()
+        self.waiters.append(slot)
+        self.queue_gauge.set(len(self.waiters))
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._shed("deadline")
+                try:
+                    await asyncio.wait_for(asyncio.shield(slot), min(remaining, DISCONNECT_POLL_SECONDS))
+                    return
+                except asyncio.TimeoutError:
+                    if is_disconnected is not None and await is_disconnected():
+                        self.shed_counter.inc(reason="disconnected")
+                        raise ClientDisconnected()
+        except BaseException:
+            if slot.done() and not slot.cancelled():
+                self.release()  # A slot was handed over as we gave up; pass it on
+            else:
+                slot.cancel()
+            raise
+        finally:
+            if slot in self.waiters:
+                self.waiters.remove(slot)
+            self.queue_gauge.set(len(self.waiters))
+
+    def release(self, held=None):
+        """Free a slot, handing it straight to the oldest waiter if there is one"""
+        if held is not None:
+            self.service_time = held if self.service_time is None else 0.8 * self.service_time + 0.2 * held
+        while self.waiters:
+            slot = self.waiters.popleft()
+            if not slot.done():
+                slot.set_result(None)
+                self.queue_gauge.set(len(self.waiters))
+                return
+        self.active -= 1
+        self.in_flight_gauge.set(self.active)
+
+    @asynccontextmanager
+    async def slot(self, is_disconnected=None, timer=None, deadline=None):
+        """Hold a slot for the duration of the block; queue time is timed as "queue_wait" """
+        if deadline is None:
+            deadline = time.monotonic() + self.timeout
+        start = time.perf_counter()
+        await self.acquire(deadline, is_disconnected)
+        acquired = time.perf_counter()
+        if timer is not None:
+            timer.record("queue_wait", acquired - start)
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - acquired)
@@ -0,0 +1,263 @@
+"""
+Crawler mode: scrape several term/category listings, follow each course
+to its detail page for the full description, and write one CSV in the
+schema the embedding scripts read (same columns as data/course-data.csv).
+
+    python -m src.crawler \\
+        https://curriculum.bennington.edu/fall2024/category/all-courses/ \\
+        https://curriculum.bennington.edu/spring2025/category/all-courses/ \\
+        -o course-data.csv
+
+Listings and detail pages are fetched concurrently through one
+requests.Session whose connection pool holds at most --workers
+connections, and no host gets more than one request per --delay seconds.
+Responses are kept in an on-disk cache (--cache-dir) together with their
+ETag/Last-Modified validators, so a re-run sends conditional requests and
+only downloads pages that changed.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .extract import parse_listing
+
+# Columns of data/course-data.csv, in order; the embedding scripts read them by position
+EMBEDDING_FIELDNAMES = [
+    'Course', 'Name', 'Start Date', 'End Date', 'Start Access Date', 'End Access Date',
+    'Section', 'Primary Faculty First Name', 'Primary Faculty Last Name',
+    'Primary Faculty Email Address', 'Department', 'Delivery Method', 'Description',
+]
+
+# Categories every course is filed under, which say nothing about its department
+GENERIC_CATEGORIES = frozenset(['all courses', 'uncategorized'])
+
+USER_AGENT = "course-embeddings-scraper/1.0 (+https://github.com/Gohlub/course-embeddings)"
+
+
+class RateLimiter:
+    """Spaces requests to the same host at least `delay` seconds apart"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.next_slot = {}  # host -> earliest time.monotonic() for its next request
+
+    def wait(self, host):
+        if self.delay <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HttpCache:
+    """One JSON file per URL holding the last body and its validators"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def load(self, url):
+        try:
+            with open(self._path(url), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('url') == url else None
+
+    def store(self, url, body, etag=None, last_modified=None):
+        path = self._path(url)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'etag': etag, 'last_modified': last_modified, 'body': body}, f)
+        os.replace(temp_path, path)  # Readers never see a half-written entry
+
+
+class Fetcher:
+    """Rate-limited, pooled, cache-aware GET; safe to share between threads"""
+
+    def __init__(self, cache=None, workers=4, delay=0.5, timeout=30, retries=2):
+        self.cache = cache
+        self.timeout = timeout
+        self.limiter = RateLimiter(delay)
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(
+            pool_connections=workers, pool_maxsize=workers, pool_block=True,
+            max_retries=Retry(total=retries, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504)),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self.stats_lock:
+            self.stats[outcome] += 1
+
+    def get(self, url):
+        """The page body, from the cache if the server says it has not changed"""
+        cached = self.cache.load(url) if self.cache else None
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        self.limiter.wait(urlsplit(url).netloc)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            self._count('not_modified')
+            return cached['body']
+        response.raise_for_status()
+
+        body = response.text
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if self.cache and (etag or last_modified):
+            self.cache.store(url, body, etag, last_modified)
+        self._count('fetched')
+        return body
+
+    def close(self):
+        self.session.close()
+
+
+def parse_description(html):
+    """A detail page's description: the entry content's paragraphs, minus the faculty block"""
+    soup = BeautifulSoup(html, 'html.parser')
+    content = soup.find('div', class_='entry-content')
+    if content is None:
+        return ''
+    for faculty in content.find_all('div', class_='faculty'):
+        faculty.decompose()
+    paragraphs = [p.get_text(' ', strip=True) for p in content.find_all('p')]
+    text = ' '.join(p for p in paragraphs if p) or content.get_text(' ', strip=True)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def to_embedding_row(course, description):
+    """Map a scraped course onto EMBEDDING_FIELDNAMES"""
+    row = {field: '' for field in EMBEDDING_FIELDNAMES}
+
+    # "AH2109.01" -> Course "AH 2109", Section "1"
+    code_match = re.match(r'([A-Z]{2,4})(\d{4})\.(\d{2})', course['Course Code'])
+    if code_match:
+        row['Course'] = f"{code_match.group(1)} {code_match.group(2)}"
+        row['Section'] = str(int(code_match.group(3)))
+    else:
+        row['Course'] = course['Course Code']
+    row['Name'] = course['Title']
+
+    # Only the first listed instructor fits the schema
+    faculty = re.split(r',|;| and | & ', course['Faculty'])[0].strip()
+    first, _, last = faculty.rpartition(' ')
+    row['Primary Faculty First Name'] = first
+    row['Primary Faculty Last Name'] = last
+
+    categories = [c.strip() for c in course['Categories'].split(';') if c.strip()]
+    row['Department'] = next((c for c in categories if c.lower() not in GENERIC_CATEGORIES), '')
+    row['Delivery Method'] = re.sub(r'^Delivery Method:\s*', '', course['Delivery Method'])
+    row['Description'] = description
+    return row
+
+
+def crawl_listing(fetcher, url, max_pages=50):
+    """Every course on a listing, following its pagination"""
+    courses = []
+    seen = set()
+    while url and url not in seen and len(seen) < max_pages:
+        seen.add(url)
+        listed, next_url = parse_listing(fetcher.get(url))
+        for course in listed:
+            if course['URL']:
+                course['URL'] = urljoin(url, course['URL'])
+            courses.append(course)
+        url = urljoin(url, next_url) if next_url else None
+    return courses
+
+
+def crawl(urls, fetcher, workers=4, max_pages=50):
+    """Scrape the listings and detail pages; returns rows keyed by EMBEDDING_FIELDNAMES"""
+
+    def listing(url):
+        try:
+            return crawl_listing(fetcher, url, max_pages)
+        except requests.RequestException as e:
+            print(f"Failed to retrieve listing {url}: {e}")
+            return []
+
+    def description(course):
+        if not course['URL']:
+            return ''
+        try:
+            return parse_description(fetcher.get(course['URL']))
+        except requests.RequestException as e:
+            print(f"Failed to retrieve {course['URL']}: {e}")
+            return ''
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # A course filed under several categories shows up on each of their listings
+        courses = {}
+        for listed in pool.map(listing, urls):
+            for course in listed:
+                courses.setdefault(course['URL'] or course['Course Code'] or course['Title'], course)
+        courses = list(courses.values())
+        descriptions = pool.map(description, courses)
+        return [to_embedding_row(course, text) for course, text in zip(courses, descriptions)]
+
+
+def write_csv(rows, path):
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=EMBEDDING_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl course listings into an embedding-ready CSV")
+    parser.add_argument("urls", nargs="+", help="Term or category listing URLs")
+    parser.add_argument("-o", "--output", default="course-data.csv", help="CSV to write")
+    parser.add_argument("--cache-dir", default=".http-cache", help="On-disk HTTP cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Always download every page")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests (and pooled connections)")
+    parser.add_argument("--delay", type=float, default=0.5, help="Minimum seconds between requests to one host")
+    parser.add_argument("--max-pages", type=int, default=50, help="Pages to follow per listing")
+    args = parser.parse_args(argv)
+
+    workers = max(1, args.workers)
+    cache = None if args.no_cache else HttpCache(args.cache_dir)
+    fetcher = Fetcher(cache, workers=workers, delay=args.delay)
+    try:
+        rows = crawl(args.urls, fetcher, workers=workers, max_pages=args.max_pages)
+    finally:
+        fetcher.close()
+
+    write_csv(rows, args.output)
+    print(f"Saved {len(rows)} courses from {len(args.urls)} listings to {args.output}")
+    print(f"Pages downloaded: {fetcher.stats['fetched']}, unchanged (served from cache): {fetcher.stats['not_modified']}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
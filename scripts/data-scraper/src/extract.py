@@ -0,0 +1,218 @@
+"""
+Single-pass extraction of courses from a listing page.
+
+The page is streamed through a parser target: every start tag, end tag
+and text node is seen once, and title, code, URL, faculty, schedule,
+delivery method and categories are collected in the same traversal,
+without building a document tree or re-parsing fragments. lxml's HTML
+parser drives the target when lxml is installed; otherwise the standard
+library's html.parser does.
+"""
+import re
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+FIELDNAMES = ['Title', 'Course Code', 'URL', 'Faculty', 'Schedule', 'Delivery Method', 'Categories']
+
+BACKENDS = ['lxml', 'html.parser'] if etree is not None else ['html.parser']
+DEFAULT_BACKEND = BACKENDS[0]
+
+# Course code in the title, typically in format (XXX1234.01)
+CODE_PATTERN = re.compile(r'\(([A-Z]{2,4}\d{4}\.\d{2}[^)]*)\)')
+CODE_STRIP_PATTERN = re.compile(r'\s*\([A-Z]{2,4}\d{4}\.\d{2}[^)]*\)\s*')
+# Notes like "(cancelled X/X/XXXX)" or "(day/time updated as of X/X/XXXX)"
+NOTE_PATTERN = re.compile(r'\s*\((cancelled|day\/time updated|time updated as of|new course code|method)[^)]*\)\s*')
+# Meeting times, e.g. "M/Th 10:00AM - 11:50AM"
+SCHEDULE_PATTERN = re.compile(r'[MTWFS][a-z]*(/[MTWFS][a-z]*)?\s+\d+:\d+[AP]M\s*-\s*\d+:\d+[AP]M')
+DELIVERY_PATTERN = re.compile(r'Delivery Method:\s*(.+)')
+
+
+def has_class(attrs, name):
+    value = attrs.get('class')
+    return bool(value) and name in value.split()
+
+
+class CourseExtractor:
+    """
+    Parser target (start/end/data/close) that collects raw course fields.
+
+    Each course starts at a header.entry-header; the first div.faculty and
+    footer.entry-meta after it belong to that course. close() returns the
+    finished course dicts, keyed by FIELDNAMES.
+    """
+
+    def __init__(self):
+        self.raw = []  # [title, url, faculty segments, categories] per course
+        self.current = None
+        self.next_url = None
+        self.header_depth = 0
+        self.in_entry_title = False
+        self.mode = None  # 'title', 'faculty' or 'meta' while inside one of those elements
+        self.depth = 0  # Nesting of the mode's element within itself
+        self.text = None  # Text pieces being collected, if any
+        self.faculty_done = self.meta_done = False
+
+    def start(self, tag, attrs):
+        mode = self.mode
+        if mode == 'faculty':
+            if tag == 'br':
+                self.current[2].append(''.join(self.text))
+                self.text = []
+            elif tag == 'div':
+                self.depth += 1
+            return
+        if mode == 'meta':
+            if tag == 'footer':
+                self.depth += 1
+            elif tag == 'a' and 'tag' in (attrs.get('rel') or '').split():
+                self.text = []
+            return
+        if mode == 'title':
+            if tag == 'a':
+                self.depth += 1
+            return
+
+        if tag == 'header':
+            if self.header_depth:
+                self.header_depth += 1
+            elif has_class(attrs, 'entry-header'):
+                self.current = ['', '', [], []]
+                self.raw.append(self.current)
+                self.header_depth = 1
+                self.faculty_done = self.meta_done = False
+        elif tag == 'h1':
+            self.in_entry_title = self.header_depth > 0 and has_class(attrs, 'entry-title')
+        elif tag == 'a':
+            if self.in_entry_title and not self.current[0] and not self.current[1]:
+                self.mode, self.depth, self.text = 'title', 1, []
+                self.current[1] = attrs.get('href') or ''
+            elif self.next_url is None and attrs.get('href') and self._is_next(attrs):
+                self.next_url = attrs['href']
+        elif tag == 'div':
+            if self.current is not None and not self.faculty_done and has_class(attrs, 'faculty'):
+                self.mode, self.depth, self.text = 'faculty', 1, []
+                self.faculty_done = True
+        elif tag == 'footer':
+            if self.current is not None and not self.meta_done and has_class(attrs, 'entry-meta'):
+                self.mode, self.depth, self.text = 'meta', 1, None
+                self.meta_done = True
+        elif tag == 'link':
+            if self.next_url is None and attrs.get('href') and self._is_next(attrs):
+                self.next_url = attrs['href']
+
+    @staticmethod
+    def _is_next(attrs):
+        return 'next' in (attrs.get('rel') or '').split() or has_class(attrs, 'next')
+
+    def end(self, tag):
+        mode = self.mode
+        if mode == 'faculty':
+            if tag == 'div':
+                self.depth -= 1
+                if not self.depth:
+                    self.current[2].append(''.join(self.text))
+                    self.mode = self.text = None
+        elif mode == 'meta':
+            if tag == 'a' and self.text is not None:
+                self.current[3].append(''.join(self.text).strip())
+                self.text = None
+            elif tag == 'footer':
+                self.depth -= 1
+                if not self.depth:
+                    self.mode = None
+        elif mode == 'title':
+            if tag == 'a':
+                self.depth -= 1
+                if not self.depth:
+                    self.current[0] = ''.join(self.text).strip()
+                    self.mode = self.text = None
+        elif tag == 'header' and self.header_depth:
+            self.header_depth -= 1
+        elif tag == 'h1':
+            self.in_entry_title = False
+
+    def data(self, text):
+        if self.text is not None:
+            self.text.append(text)
+
+    def close(self):
+        if self.mode == 'faculty':  # Page ended inside the faculty block
+            self.current[2].append(''.join(self.text))
+        return [finish_course(*raw) for raw in self.raw]
+
+
+def finish_course(full_title, url, faculty_segments, categories):
+    """Turn the raw fields of one course into a dict keyed by FIELDNAMES"""
+    code_match = CODE_PATTERN.search(full_title)
+    if code_match:
+        code = code_match.group(1).strip()
+        title = CODE_STRIP_PATTERN.sub('', full_title).strip()
+    else:
+        code = ''
+        title = full_title
+    title = NOTE_PATTERN.sub('', title).strip()
+
+    # Faculty comes before the first <br>, the schedule after it
+    faculty = faculty_segments[0].strip() if faculty_segments else ''
+    schedule = ''
+    if len(faculty_segments) > 1 and SCHEDULE_PATTERN.search(faculty_segments[1]):
+        schedule = faculty_segments[1].strip()
+    delivery = ''
+    for segment in faculty_segments:
+        delivery_match = DELIVERY_PATTERN.search(segment)
+        if delivery_match:
+            delivery = f"Delivery Method: {delivery_match.group(1).strip()}"
+            break
+
+    return {
+        'Title': title,
+        'Course Code': code,
+        'URL': url,
+        'Faculty': faculty,
+        'Schedule': schedule,
+        'Delivery Method': delivery,
+        'Categories': '; '.join(name for name in categories if name),
+    }
+
+
+class _StdlibParser(HTMLParser):
+    """Feeds html.parser events to a parser target the way lxml does"""
+
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def parse_listing(html, backend=None):
+    """
+    Courses on a listing page and the href of its next page (or None).
+
+    backend is 'lxml' or 'html.parser'; the default is lxml when installed.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown or unavailable parser backend: {backend}")
+    target = CourseExtractor()
+    if backend == 'lxml':
+        parser = etree.HTMLParser(target=target)
+        parser.feed(html)
+        courses = parser.close()
+    else:
+        parser = _StdlibParser(target)
+        parser.feed(html)
+        parser.close()
+        courses = target.close()
+    return courses, target.next_url
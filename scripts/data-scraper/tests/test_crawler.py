@@ -0,0 +1,163 @@
+"""
+Tests for the crawler, against a local HTTP fixture server.
+"""
+import csv
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.crawler import EMBEDDING_FIELDNAMES, Fetcher, HttpCache, crawl, main
+
+
+def listing_entry(title, href, faculty, categories):
+    tags = ''.join(f'<a href="/category/{c}/" rel="tag">{c}</a>' for c in categories)
+    return f"""
+    <article>
+      <header class="entry-header"><h1 class="entry-title"><a href="{href}">{title}</a></h1></header>
+      <div class="entry-content">
+        <div class="faculty">{faculty}<br/>M/Th 10:00AM - 11:50AM<br/>Delivery Method: On Campus</div>
+      </div>
+      <footer class="entry-meta">{tags}</footer>
+    </article>"""
+
+
+def detail_page(description):
+    return f"""<html><body><article>
+      <div class="entry-content">
+        <div class="faculty"><p>Someone</p></div>
+        <p>{description}</p>
+        <p>Prerequisites: none.</p>
+      </div>
+    </article></body></html>"""
+
+
+FIXTURES = {
+    '/fall/': '<html><body>' + listing_entry(
+        'Toward a Rigorous Art History (AH2109.01)', '/fall/ah2109/', 'J. Vanessa Lyon', ['All Courses', 'Visual Arts'],
+    ) + '<a class="next page-numbers" href="/fall/page/2/">Next</a></body></html>',
+    '/fall/page/2/': '<html><body>' + listing_entry(
+        'Intro to Ecology (cancelled 8/1/2024) (BIO2105.02)', '/fall/bio2105/', 'Kerry Woods and Jane Doe',
+        ['Science and Mathematics'],
+    ) + '</body></html>',
+    '/spring/': '<html><body>' + listing_entry(
+        'Toward a Rigorous Art History (AH2109.01)', '/fall/ah2109/', 'J. Vanessa Lyon', ['Visual Arts'],
+    ) + listing_entry(
+        'Composition I (MUS2101.01)', '/spring/mus2101/', 'Nick Brooke', ['Music'],
+    ) + '</body></html>',
+    '/fall/ah2109/': detail_page('A rigorous study of art.'),
+    '/fall/bio2105/': detail_page('Populations and communities.'),
+    '/spring/mus2101/': detail_page('Writing music.'),
+}
+
+
+LISTINGS = ('/fall/', '/fall/page/2/', '/spring/')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves FIXTURES with ETags for listings and Last-Modified for detail pages, honouring conditional requests"""
+
+    def do_GET(self):
+        server = self.server
+        body = server.pages.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        with server.lock:
+            server.requests.append(self.path)
+
+        version = server.versions.get(self.path, 1)
+        if self.path in LISTINGS:
+            validator, header, conditional = f'"v{version}"', 'ETag', 'If-None-Match'
+        else:
+            validator, header, conditional = f'Mon, 0{version} Sep 2024 00:00:00 GMT', 'Last-Modified', 'If-Modified-Since'
+
+        if self.headers.get(conditional) == validator:
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header(header, validator)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCrawler(unittest.TestCase):
+    """Test cases for the crawler module."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        self.server.pages = dict(FIXTURES)
+        self.server.versions = {}
+        self.server.requests = []
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmp = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp, 'cache')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp)
+
+    def run_crawl(self):
+        fetcher = Fetcher(HttpCache(self.cache_dir), workers=3, delay=0)
+        try:
+            rows = crawl([f"{self.base}/fall/", f"{self.base}/spring/"], fetcher, workers=3)
+        finally:
+            fetcher.close()
+        return rows, fetcher.stats
+
+    def test_crawl_writes_embedding_schema(self):
+        """Listings are paginated and merged, and detail pages supply descriptions."""
+        output = os.path.join(self.tmp, 'course-data.csv')
+        main([f"{self.base}/fall/", f"{self.base}/spring/", '-o', output,
+              '--cache-dir', self.cache_dir, '--delay', '0', '--workers', '2'])
+
+        with open(output, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            self.assertEqual(next(reader), EMBEDDING_FIELDNAMES)
+            rows = [dict(zip(EMBEDDING_FIELDNAMES, row)) for row in reader]
+
+        self.assertEqual([row['Course'] for row in rows], ['AH 2109', 'BIO 2105', 'MUS 2101'])
+        art, ecology, music = rows
+        self.assertEqual(art['Name'], 'Toward a Rigorous Art History')
+        self.assertEqual(art['Section'], '1')
+        self.assertEqual((art['Primary Faculty First Name'], art['Primary Faculty Last Name']), ('J. Vanessa', 'Lyon'))
+        self.assertEqual(art['Department'], 'Visual Arts')
+        self.assertEqual(art['Delivery Method'], 'On Campus')
+        self.assertEqual(art['Description'], 'A rigorous study of art. Prerequisites: none.')
+        self.assertEqual(ecology['Name'], 'Intro to Ecology')
+        self.assertEqual(ecology['Section'], '2')
+        self.assertEqual(ecology['Primary Faculty Last Name'], 'Woods')
+        self.assertEqual(music['Department'], 'Music')
+        # The shared course's detail page is only fetched once
+        self.assertEqual(self.server.requests.count('/fall/ah2109/'), 1)
+
+    def test_rerun_uses_conditional_requests(self):
+        """A second crawl is answered with 304s and only changed pages are downloaded again."""
+        first, stats = self.run_crawl()
+        self.assertEqual(stats['fetched'], 6)
+
+        second, stats = self.run_crawl()
+        self.assertEqual(second, first)
+        self.assertEqual((stats['fetched'], stats['not_modified']), (0, 6))
+
+        self.server.pages['/spring/mus2101/'] = detail_page('Writing and performing music.')
+        self.server.versions['/spring/mus2101/'] = 2
+        third, stats = self.run_crawl()
+        self.assertEqual((stats['fetched'], stats['not_modified']), (1, 5))
+        self.assertEqual(third[2]['Description'], 'Writing and performing music. Prerequisites: none.')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for the single-pass listing extractor.
+"""
+import unittest
+
+from src.extract import BACKENDS, parse_listing
+
+LISTING = """<!DOCTYPE html>
+<html><head><link rel="next" href="/spring2024/category/all-courses/page/2/"></head>
+<body>
+<article>
+  <header class="entry-header">
+    <h1 class="entry-title"><a href="/spring2024/ah2109/">Toward a Rigorous Art History (AH2109.01) (cancelled 1/5/2024)</a></h1>
+  </header>
+  <div class="entry-content">
+    <div class="faculty">J. Vanessa <span>Lyon</span><br/>
+      M/Th 10:00AM - 11:50AM<br>Delivery Method: On Campus</div>
+  </div>
+  <footer class="entry-meta"><a href="/c/all/" rel="category tag">All Courses</a>, <a href="/c/va/" rel="tag">Visual Arts</a></footer>
+</article>
+<article>
+  <header class="entry-header entry-header--wide">
+    <h1 class="entry-title"><a href="/spring2024/ws/">Rehearsal &amp; Performance Workshop</a></h1>
+  </header>
+  <div class="entry-content"><p>No faculty listed yet.</p></div>
+  <footer class="entry-meta"><a href="/c/dance/" rel="tag">Dance</a></footer>
+</article>
+<article>
+  <header class="entry-header">
+    <h1 class="entry-title"><a href="/spring2024/mus2101/">Composition I (MUS2101.02)</a></h1>
+  </header>
+  <div class="faculty"><div class="name">Nick Brooke</div><br/>Tuesdays only<br/>Delivery Method: Hybrid</div>
+</article>
+</body></html>
+"""
+
+
+class TestExtract(unittest.TestCase):
+    """Test cases for the extract module."""
+
+    def test_backends_agree(self):
+        """Every available parser backend yields the same courses and next page."""
+        results = [parse_listing(LISTING, backend) for backend in BACKENDS]
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+
+    def test_fields(self):
+        """Fields are pulled from each course's own header, faculty block and footer."""
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                courses, next_url = parse_listing(LISTING, backend)
+                self.assertEqual(next_url, '/spring2024/category/all-courses/page/2/')
+                self.assertEqual(len(courses), 3)
+                art, workshop, music = courses
+
+                self.assertEqual(art['Title'], 'Toward a Rigorous Art History')
+                self.assertEqual(art['Course Code'], 'AH2109.01')
+                self.assertEqual(art['URL'], '/spring2024/ah2109/')
+                self.assertEqual(art['Faculty'], 'J. Vanessa Lyon')
+                self.assertEqual(art['Schedule'], 'M/Th 10:00AM - 11:50AM')
+                self.assertEqual(art['Delivery Method'], 'Delivery Method: On Campus')
+                self.assertEqual(art['Categories'], 'All Courses; Visual Arts')
+
+                # A course without a faculty block does not take the next course's
+                self.assertEqual(workshop['Title'], 'Rehearsal & Performance Workshop')
+                self.assertEqual(workshop['Course Code'], '')
+                self.assertEqual(workshop['Faculty'], '')
+                self.assertEqual(workshop['Categories'], 'Dance')
+
+                self.assertEqual(music['Course Code'], 'MUS2101.02')
+                self.assertEqual(music['Faculty'], 'Nick Brooke')
+                self.assertEqual(music['Schedule'], '')  # No meeting time in the second segment
+                self.assertEqual(music['Delivery Method'], 'Delivery Method: Hybrid')
+                self.assertEqual(music['Categories'], '')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            parse_listing(LISTING, 'html5lib')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -73,6 +73,10 @@ def process_csv():
     new_rows = []
     print(f"Processing {len(rows)} course descriptions...")
     
+    # Sections of the same course share code, name and description,
+    # so each distinct text only needs to be embedded once
+    embedding_cache = {}
+    
     for row in tqdm(rows):
         if len(row) >= 13:  # Make sure the row has a description column
             # Extract all the necessary fields
@@ -81,7 +85,10 @@ def process_csv():
             description = row[12]  # Course description
             
             # Get embedding with enhanced context
-            embedding = get_embedding(description, name, code)
+            key = (code, name, description)
+            if key not in embedding_cache:
+                embedding_cache[key] = get_embedding(description, name, code)
+            embedding = embedding_cache[key]
             
             # Add the embedding (as a string representation) to the row
             new_row = row + [json.dumps(embedding)]
@@ -98,6 +105,7 @@ def process_csv():
         writer.writerow(new_header)
         writer.writerows(new_rows)
     
+    print(f"Embedded {len(embedding_cache)} unique course texts")
     print(f"Completed! Embeddings saved to '{output_csv}'")
 
 if __name__ == "__main__":
@@ -5,6 +5,8 @@ import os
 import time
 from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
+from token_budget import (MAX_TOKENS, BATCH_SIZE, count_tokens, encode_with_budget,
+                          prompt_length, token_length_stats, format_stats)
 
 # Input and output file paths
 input_csv = '../course-embd-data.csv'  # Assuming it's in parent directory
@@ -22,7 +24,7 @@ def generate_embeddings():
     # Load the model
     print(f"Loading model...")
     model = SentenceTransformer('nvidia/NV-Embed-v2', trust_remote_code=True, device="cpu")
-    model.max_seq_length = 16384
+    model.max_seq_length = MAX_TOKENS  # Longer texts are chunked by encode_with_budget
     model.tokenizer.padding_side = "right"
     print(f"Model loaded")
     
@@ -36,11 +38,9 @@ def generate_embeddings():
     # Add 'Embedding' to the header
     new_header = header + ['Embedding']
     
-    # Process each row and add embeddings
-    new_rows = []
-    print(f"Processing {len(rows)} course descriptions...")
-    
-    for row in tqdm(rows):
+    # Collect the texts to embed, keyed by row index
+    texts = {}
+    for i, row in enumerate(rows):
         if len(row) >= 13:  # Make sure the row has a description column
             # Extract all the necessary fields
             code = row[0]  # Course code
@@ -48,32 +48,40 @@ def generate_embeddings():
             description = row[12]  # Course description
             
             # Skip empty descriptions
-            if not description or description.strip() == '':
-                embedding = []
-            else:
+            if description and description.strip() != '':
                 # Enhanced text with course context
-                enhanced_text = f"Course {code}: {name}\n\n{description}"
-                
-                # Add EOS token to input text
-                input_text = enhanced_text + model.tokenizer.eos_token
-                
-                # Generate embedding with passage instruction
-                with torch.no_grad():
-                    embedding = model.encode(
-                        [input_text], 
-                        batch_size=1, 
-                        normalize_embeddings=True,
-                        prompt=PASSAGE_INSTRUCTION
-                    )[0].tolist()
-            
-            # Add the embedding (as a string representation) to the row
-            new_row = row + [json.dumps(embedding)]
-            new_rows.append(new_row)
+                texts[i] = f"Course {code}: {name}\n\n{description}"
         else:
             print(f"Warning: Row doesn't have enough columns: {row}")
-            # Add an empty embedding
-            new_row = row + ['[]']
-            new_rows.append(new_row)
+    
+    # Sections of the same course share their text; embed each text once
+    unique_texts = list(dict.fromkeys(texts.values()))
+    print(f"{len(texts)} rows with descriptions, {len(unique_texts)} unique texts")
+    
+    # Report how the token budget affects this catalog
+    stats = token_length_stats(count_tokens(model.tokenizer, unique_texts),
+                               prompt_tokens=prompt_length(model.tokenizer, PASSAGE_INSTRUCTION))
+    print(format_stats(stats))
+    
+    # Encode in batches; long descriptions are chunked and pooled
+    print(f"Processing {len(unique_texts)} course descriptions...")
+    text_embeddings = {}
+    encode_start = time.time()
+    for start in tqdm(range(0, len(unique_texts), BATCH_SIZE)):
+        batch = unique_texts[start:start + BATCH_SIZE]
+        with torch.no_grad():
+            vectors = encode_with_budget(model, batch, PASSAGE_INSTRUCTION)
+        for text, vector in zip(batch, vectors):
+            text_embeddings[text] = vector.tolist()
+    encode_time = time.time() - encode_start
+    embeddings = {i: text_embeddings[text] for i, text in texts.items()}
+    
+    # Add the embedding (as a string representation) to each row
+    new_rows = [row + [json.dumps(embeddings.get(i, []))] for i, row in enumerate(rows)]
+    
+    # Only the measured time is reported; for an unbudgeted comparison run
+    # token_budget.py --measure, which times both on the same texts
+    print(f"Encoding took {encode_time:.2f}s for {stats.get('chunks', 0)} chunks")
     
     # Write to the output CSV file
     with open(output_csv, 'w', newline='', encoding='utf-8') as file:
@@ -1,11 +1,17 @@
 import torch
 import time
-from fastapi import FastAPI, HTTPException
+import threading
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 import uvicorn
 import os
+import metrics
+import admission
 from sentence_transformers import SentenceTransformer
+from starlette.concurrency import run_in_threadpool
+from token_budget import MAX_TOKENS, encode_with_budget
 
 app = FastAPI()
 os.environ['CUDA_VISIBLE_DEVICES'] = '-1'  # This disables CUDA completely
@@ -17,7 +23,7 @@ print(f"Using device: {device.type}")
 # Then load the model with CPU - using a more recent model that supports asymmetric semantic search
 print("Loading model...")
 model = SentenceTransformer('nvidia/NV-Embed-v2', trust_remote_code=True, device=device)
-model.max_seq_length = 16384
+model.max_seq_length = MAX_TOKENS  # Longer texts are chunked by encode_with_budget
 model.tokenizer.padding_side = "right"
 
 print(f"Model loaded on {device}")
@@ -30,50 +36,101 @@ class EmbeddingRequest(BaseModel):
 class EmbeddingResponse(BaseModel):
     embeddings: List[List[float]]
     time_taken: float
+    stages: Optional[Dict[str, float]] = None  # Per-stage seconds, only when tracing
 
 # Query instructions for better semantic search
 QUERY_INSTRUCTION = "Provide a concise and relevant answer to the question"
 PASSAGE_INSTRUCTION = "Provide information that would help answer questions"
 
+# The model encodes one request at a time. Admission control already times
+# the wait for a slot as "queue_wait"; waiting for the lock itself (only when
+# EMBED_MAX_CONCURRENCY is above one) is "encoder_lock_wait"
+encoder_lock = threading.Lock()
+
+# Admission control: at most EMBED_MAX_CONCURRENCY requests encode at once and
+# EMBED_MAX_QUEUE more wait; the rest, and requests still waiting after
+# EMBED_TIMEOUT seconds, get 503 with Retry-After (at least EMBED_RETRY_AFTER)
+embed_admission = admission.AdmissionController(
+    "embed",
+    max_concurrency=int(os.environ.get("EMBED_MAX_CONCURRENCY", "1")),
+    max_queue=int(os.environ.get("EMBED_MAX_QUEUE", "16")),
+    timeout=float(os.environ.get("EMBED_TIMEOUT", "30")),
+    retry_after=int(os.environ.get("EMBED_RETRY_AFTER", "1"))
+)
+
+# Metrics exposed on /metrics
+EMBED_REQUESTS = metrics.REGISTRY.counter(
+    "embed_requests_total", "Embedding requests by kind and outcome", ["kind", "status"])
+EMBED_TEXTS = metrics.REGISTRY.counter(
+    "embed_texts_total", "Texts embedded", ["kind"])
+EMBED_BATCH_SIZE = metrics.REGISTRY.histogram(
+    "embed_batch_size", "Texts per embedding request", buckets=metrics.SIZE_BUCKETS)
+EMBED_LATENCY = metrics.REGISTRY.histogram(
+    "embed_seconds", "End-to-end embedding request latency")
+EMBED_STAGE_LATENCY = metrics.REGISTRY.histogram(
+    "embed_stage_seconds", "Embedding latency per stage", ["stage"])
+
+def encode_texts(texts, is_query, timer):
+    """Encode with the model, one request at a time"""
+    with timer.stage("encoder_lock_wait"):
+        encoder_lock.acquire()
+    try:
+        with timer.stage("encode"), torch.no_grad():
+            # Queries and passages use different instructions; long texts are
+            # split into budgeted chunks and pooled back into one vector
+            prompt = QUERY_INSTRUCTION if is_query else PASSAGE_INSTRUCTION
+            return encode_with_budget(model, texts, prompt)
+    finally:
+        encoder_lock.release()
+
+# Admission runs on the event loop; the encoding itself runs in the threadpool
+# so it never blocks the loop.
 @app.post("/embed", response_model=EmbeddingResponse)
-async def embed_texts(request: EmbeddingRequest):
+async def embed_texts(request: EmbeddingRequest, raw_request: Request):
     start_time = time.time()
+    timer = metrics.StageTimer(EMBED_STAGE_LATENCY)
+    kind = "query" if request.is_query else "passage"
+    EMBED_BATCH_SIZE.observe(len(request.texts))
     
     try:
-        with torch.no_grad():
-            # Add EOS token to input texts
-            input_texts = [text + model.tokenizer.eos_token for text in request.texts]
-            
-            if request.is_query:
-                # For queries, use the specific instruction for queries
-                embeddings = model.encode(
-                    input_texts, 
-                    batch_size=1, 
-                    normalize_embeddings=True,
-                    prompt=QUERY_INSTRUCTION
-                )
-            else:
-                # For passages, use the passage instruction
-                embeddings = model.encode(
-                    input_texts, 
-                    batch_size=1, 
-                    normalize_embeddings=True,
-                    prompt=PASSAGE_INSTRUCTION
-                )
-            
-            print(f"Embedding size: {embeddings.shape}")
-            
-            # Convert numpy array to list
-            embeddings_list = embeddings.tolist()
-            
-        time_taken = time.time() - start_time
-        return EmbeddingResponse(embeddings=embeddings_list, time_taken=time_taken)
-    
+        async with embed_admission.slot(raw_request.is_disconnected, timer):
+            embeddings = await run_in_threadpool(encode_texts, request.texts, request.is_query, timer)
+    except admission.Overloaded as e:
+        EMBED_REQUESTS.inc(kind=kind, status="shed")
+        raise HTTPException(status_code=503, detail="Encoder is overloaded, retry later",
+                            headers={"Retry-After": str(e.retry_after)})
+    except admission.ClientDisconnected:
+        EMBED_REQUESTS.inc(kind=kind, status="disconnected")
+        raise HTTPException(status_code=503, detail="Client disconnected")
     except Exception as e:
+        EMBED_REQUESTS.inc(kind=kind, status="error")
         print(f"Error: {str(e)}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if timer.trace:
+        print(f"Embedding size: {embeddings.shape}")
+    
+    with timer.stage("response"):
+        # Convert numpy array to list
+        embeddings_list = embeddings.tolist()
+    
+    EMBED_REQUESTS.inc(kind=kind, status="ok")
+    EMBED_TEXTS.inc(len(request.texts), kind=kind)
+    EMBED_LATENCY.observe(timer.elapsed())
+    
+    time_taken = time.time() - start_time
+    return EmbeddingResponse(
+        embeddings=embeddings_list,
+        time_taken=time_taken,
+        stages=timer.stages if timer.trace else None
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics: request counts, batch sizes and latency histograms"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
 
 # Add a simple test endpoint that doesn't use the model
 @app.post("/test")
@@ -0,0 +1,259 @@
+"""
+Token-budgeted encoding for long course descriptions.
+
+Texts that fit in the budget are encoded as-is. Longer texts are split into
+overlapping token windows, all windows are encoded together as one batch and
+the window embeddings are pooled back into one normalized vector per text.
+
+Run directly to report the token-length distribution of a catalog:
+
+    python token_budget.py ../data/course-data.csv
+    python token_budget.py ../data/course-data.csv --measure 20
+"""
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+# Maximum tokens per encoded sequence, instruction prompt included
+MAX_TOKENS = int(os.environ.get("EMBED_MAX_TOKENS", "512"))
+# Tokens shared between consecutive chunks of a long text
+CHUNK_OVERLAP = int(os.environ.get("EMBED_CHUNK_OVERLAP", "64"))
+# How chunk embeddings are combined: "mean" or "weighted" (by chunk token count)
+POOLING = os.environ.get("EMBED_POOLING", "weighted")
+# Number of sequences per forward pass
+BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "8"))
+
+# The model's own limit, used as the "unbudgeted" baseline in reports
+MODEL_MAX_TOKENS = 16384
+
+# Tokens reserved for BOS/EOS around every chunk
+SPECIAL_TOKENS = 2
+
+
+def count_tokens(tokenizer, texts):
+    """Return the number of tokens in each text (without special tokens)"""
+    if not texts:
+        return []
+    encoded = tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+    return [len(ids) for ids in encoded]
+
+
+def prompt_length(tokenizer, prompt):
+    """Number of tokens the instruction prompt adds to every sequence"""
+    return count_tokens(tokenizer, [prompt])[0] if prompt else 0
+
+
+def text_budget(prompt_tokens, max_tokens=MAX_TOKENS):
+    """Number of text tokens that fit in one sequence next to prompt_tokens of prompt"""
+    return max(16, max_tokens - prompt_tokens - SPECIAL_TOKENS)
+
+
+def chunk_budget(tokenizer, prompt, max_tokens=MAX_TOKENS):
+    """Number of text tokens that fit in one sequence next to the prompt"""
+    return text_budget(prompt_length(tokenizer, prompt), max_tokens)
+
+
+def chunk_text(tokenizer, text, chunk_tokens, overlap=CHUNK_OVERLAP):
+    """
+    Split a text into token windows of at most chunk_tokens tokens.
+
+    Returns:
+        (chunks, lengths): the chunk strings and their token counts
+    """
+    ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+    if len(ids) <= chunk_tokens:
+        return [text], [len(ids)]
+
+    step = max(1, chunk_tokens - overlap)
+    chunks = []
+    lengths = []
+    for start in range(0, len(ids), step):
+        window = ids[start:start + chunk_tokens]
+        chunks.append(tokenizer.decode(window, skip_special_tokens=True))
+        lengths.append(len(window))
+        if start + chunk_tokens >= len(ids):
+            break
+    return chunks, lengths
+
+
+def pool_embeddings(chunk_embeddings, owners, weights, num_texts, pooling=POOLING):
+    """Combine chunk embeddings into one L2-normalized vector per text"""
+    chunk_embeddings = np.asarray(chunk_embeddings, dtype=np.float32)
+    owners = np.asarray(owners, dtype=np.int64)
+    if pooling == "weighted":
+        w = np.asarray(weights, dtype=np.float32)
+    else:
+        w = np.ones(len(owners), dtype=np.float32)
+
+    pooled = np.zeros((num_texts, chunk_embeddings.shape[1]), dtype=np.float32)
+    np.add.at(pooled, owners, chunk_embeddings * w[:, None])
+
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return pooled / norms
+
+
+def encode_with_budget(model, texts, prompt, max_tokens=MAX_TOKENS,
+                       overlap=CHUNK_OVERLAP, pooling=POOLING, batch_size=BATCH_SIZE):
+    """
+    Encode texts with a SentenceTransformer model under a token budget.
+
+    Every text is split into chunks that fit max_tokens together with the
+    prompt, the chunks of all texts are encoded in one batched call and then
+    pooled per text.
+
+    Returns:
+        numpy array of shape (len(texts), dim)
+    """
+    tokenizer = model.tokenizer
+    chunk_tokens = chunk_budget(tokenizer, prompt, max_tokens)
+
+    chunks = []
+    owners = []
+    weights = []
+    for i, text in enumerate(texts):
+        pieces, lengths = chunk_text(tokenizer, text, chunk_tokens, overlap)
+        chunks.extend(pieces)
+        owners.extend([i] * len(pieces))
+        weights.extend(lengths)
+
+    # Add EOS token to every chunk
+    input_texts = [chunk + tokenizer.eos_token for chunk in chunks]
+    chunk_embeddings = model.encode(
+        input_texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        prompt=prompt
+    )
+    return pool_embeddings(chunk_embeddings, owners, weights, len(texts), pooling)
+
+
+def token_length_stats(lengths, max_tokens=MAX_TOKENS, overlap=CHUNK_OVERLAP, prompt_tokens=0):
+    """
+    Summarize a token-length distribution and the effect of the budget on it.
+
+    Texts are chunked exactly as encode_with_budget() does: each chunk holds
+    at most text_budget(prompt_tokens, max_tokens) text tokens, so pass the
+    prompt's length (prompt_length()) to match a prompted encode.
+
+    The cost ratio models attention only (cost ~ sequence tokens^2, prompt
+    and special tokens included), comparing the model's own limit against
+    the chunked budget. The linear layers, which dominate for short texts,
+    cost the same either way, so the real saving is smaller.
+    """
+    if not lengths:
+        return {"count": 0}
+
+    arr = np.asarray(lengths, dtype=np.int64)
+    chunk_tokens = text_budget(prompt_tokens, max_tokens)
+    step = max(1, chunk_tokens - overlap)
+    chunk_counts = np.where(arr <= chunk_tokens, 1, 1 + np.ceil((arr - chunk_tokens) / step)).astype(np.int64)
+    extra = prompt_tokens + SPECIAL_TOKENS
+
+    full = np.minimum(arr + extra, MODEL_MAX_TOKENS).astype(np.float64)
+    full_cost = float(np.sum(full ** 2))
+    # Each chunk holds at most chunk_tokens text tokens; the last one covers the remainder
+    budget_cost = 0.0
+    for length, count in zip(arr, chunk_counts):
+        if count == 1:
+            budget_cost += float(length + extra) ** 2
+        else:
+            last = length - step * (count - 1)
+            budget_cost += int(count - 1) * float(chunk_tokens + extra) ** 2 + float(max(last, 0) + extra) ** 2
+
+    return {
+        "count": int(arr.size),
+        "min": int(arr.min()),
+        "mean": float(arr.mean()),
+        "p50": float(np.percentile(arr, 50)),
+        "p90": float(np.percentile(arr, 90)),
+        "p99": float(np.percentile(arr, 99)),
+        "max": int(arr.max()),
+        "max_tokens": max_tokens,
+        "chunk_tokens": chunk_tokens,
+        "over_budget": int(np.sum(arr > chunk_tokens)),
+        "chunks": int(chunk_counts.sum()),
+        "attention_cost_ratio": budget_cost / full_cost if full_cost else 1.0,
+    }
+
+
+def format_stats(stats):
+    """Render token_length_stats() output as a short human-readable report"""
+    if not stats.get("count"):
+        return "No texts to report on"
+    lines = [
+        f"Token lengths over {stats['count']} texts: "
+        f"min={stats['min']} mean={stats['mean']:.1f} p50={stats['p50']:.0f} "
+        f"p90={stats['p90']:.0f} p99={stats['p99']:.0f} max={stats['max']}",
+        f"Budget {stats['max_tokens']} tokens ({stats['chunk_tokens']} text tokens per chunk): "
+        f"{stats['over_budget']} texts over budget, {stats['chunks']} chunks to encode",
+        f"Attention-only cost estimate vs. unbudgeted: {stats['attention_cost_ratio']:.1%} "
+        f"(use --measure for real timings)",
+    ]
+    return "\n".join(lines)
+
+
+def read_catalog_texts(csv_file):
+    """Read the enhanced passage texts used for embedding from a course CSV"""
+    texts = []
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)  # Skip header
+        for row in reader:
+            if len(row) >= 13 and row[12].strip():
+                texts.append(f"Course {row[0]}: {row[1]}\n\n{row[12]}")
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report token-length statistics for a course catalog")
+    parser.add_argument("csv_file", help="Course CSV (same schema as course-data.csv)")
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--measure", type=int, default=0, metavar="N",
+                        help="Load the model and time the N longest texts with and without the budget")
+    args = parser.parse_args()
+
+    texts = read_catalog_texts(args.csv_file)
+    prompt = "Provide information that would help answer questions"
+
+    if args.measure <= 0:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained('nvidia/NV-Embed-v2', trust_remote_code=True)
+        print(format_stats(token_length_stats(count_tokens(tokenizer, texts), args.max_tokens, args.overlap,
+                                              prompt_length(tokenizer, prompt))))
+        return
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer('nvidia/NV-Embed-v2', trust_remote_code=True, device="cpu")
+    model.tokenizer.padding_side = "right"
+    lengths = count_tokens(model.tokenizer, texts)
+    print(format_stats(token_length_stats(lengths, args.max_tokens, args.overlap,
+                                          prompt_length(model.tokenizer, prompt))))
+
+    order = np.argsort(lengths)[::-1][:args.measure]
+    sample = [texts[i] for i in order]
+
+    with torch.no_grad():
+        model.max_seq_length = MODEL_MAX_TOKENS
+        start = time.time()
+        model.encode([t + model.tokenizer.eos_token for t in sample], batch_size=1,
+                     normalize_embeddings=True, prompt=prompt)
+        full_time = time.time() - start
+
+        model.max_seq_length = args.max_tokens
+        start = time.time()
+        encode_with_budget(model, sample, prompt, args.max_tokens, args.overlap)
+        budget_time = time.time() - start
+
+    print(f"Encoded {len(sample)} longest texts: unbudgeted {full_time:.2f}s, "
+          f"budgeted {budget_time:.2f}s ({full_time - budget_time:.2f}s saved)")
+
+
+if __name__ == "__main__":
+    main()